@@ -0,0 +1,124 @@
+# --- COMPARE THE LP BACKENDS ON THE SMALL, MEDIUM AND LARGE INSTANCES ---
+#
+# python benchmark_lp.py [max iterations]
+#
+# The same column generation is run with each backend (see solvers.py) : the restricted master starts from the
+# shortest path of each commodity (with the artificial variables of the Phase-I mode), and each round adds the path
+# with the most negative reduced cost of every commodity. The time spent in the restricted master is reported.
+# A backend which isn't installed is skipped. The three instances are run with the modules of this directory (a single copy of the script).
+
+import os
+import sys
+import time
+
+import numpy as np
+
+from instance import fromModule, getInstanceGraph
+from shortest_path import Graph, shortestPaths
+from pricing import reducedCosts, groupByOrigin, extractPaths
+from master import RestrictedMaster
+from paths import Path
+from solvers import SolverError
+
+root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))) # Root of the repository
+
+# Name - Data module - Capacity of each node type - Capacity of each arc (from the last column of the arcs)
+instances = [('Small', os.path.join(root, 'Small_instance', 'small_data.py'), [2200, 4400, 6600],
+              lambda column: np.array([440, 770, 1100, 1430])[column - 1]), # (The column is the type of the arc)
+             ('Medium', os.path.join(root, 'Medium_instance', 'Updated_data', 'medium_data.py'), [1000, 45, 45, 80],
+              lambda column: column / 75.),
+             ('Large', os.path.join(root, 'Large_instance', 'Updated_data', 'large_data.py'), [10000, 700, 700, 1400],
+              lambda column: column / 8.)]
+
+backends = ['cplex', 'highs']
+
+
+def getPaths(origins, byOrigin, destinations, graph, costs, commodities):
+    """ Return the shortest path of each commodity, as well as the length of each path under costs
+
+        origins, byOrigin : Distinct origins, and the commodities leaving each of them
+        destinations : Ending node of each commodity
+        commodities : Commodities whose paths are returned
+    """
+    rows = np.zeros(len(destinations), dtype=int) # Tree of the origin of each commodity
+    labels = np.full((len(origins), graph.offsets.size - 1), np.inf)
+    precedents_node = np.full(labels.shape, -1, dtype=int)
+    precedents_arc = np.full(labels.shape, -1, dtype=int)
+    for j in range(len(origins)):
+        rows[byOrigin[j]] = j
+        labels[j], precedents_node[j], precedents_arc[j] = shortestPaths(origins[j], graph, costs, None, None, destinations[byOrigin[j]])
+
+    pathNodes, pathArcs = extractPaths(rows[commodities], destinations[commodities], precedents_node, precedents_arc)
+
+    paths = []
+    for j in range(len(commodities)):
+        steps = pathArcs[j] >= 0 # (The paths were read backward from the destination)
+        paths.append((pathNodes[j][steps][::-1], pathArcs[j][steps][::-1]))
+
+    return paths, labels[rows[commodities], destinations[commodities]]
+
+def runColumnGeneration(instance, capacityNodes, capacityArcs, backend, maxIterations):
+    """ Return the number of iterations, the objective value, the time spent in the restricted master and the total time
+
+        instance : Columns of the instance
+        capacityNodes : Capacity of each node
+        capacityArcs : Capacity of each arc
+        backend : LP backend of the restricted master
+        maxIterations : Largest number of iterations
+    """
+    start = time.time()
+
+    graph = Graph(*getInstanceGraph(instance))
+    arcCosts = np.asarray(instance.arcCosts, dtype=float)
+    destinations, quantities = np.asarray(instance.destinations), np.asarray(instance.quantities)
+    origins, byOrigin = groupByOrigin(instance.origins)
+
+    master = RestrictedMaster(quantities, capacityNodes, capacityArcs, float(np.sum(arcCosts)), backend)
+
+    # -- Shortest path of each commodity --
+    commodities = np.arange(len(quantities))
+    paths, lengths = getPaths(origins, byOrigin, destinations, graph, graph.costs.astype(float), commodities)
+    reachable = np.isfinite(lengths)
+    master.addColumns(commodities[reachable], [Path(nodes, arcs, np.sum(arcCosts[arcs])) for (nodes, arcs), ok in zip(paths, reachable) if ok])
+
+    masterTime = 0
+    for iteration in range(1, maxIterations+1):
+        s_master = time.time()
+        objective, solution = master.solve()
+        dualCommodities, dualStations, dualArcs = master.getDuals()
+        masterTime += time.time() - s_master
+
+        # -- Pricing : path with the most negative reduced cost of each commodity --
+        paths, lengths = getPaths(origins, byOrigin, destinations, graph, reducedCosts(graph, dualStations, dualArcs), commodities[reachable])
+        reducedCost = lengths * quantities[reachable] - np.asarray(dualCommodities)[reachable]
+        negative = np.nonzero(reducedCost < -1e-6)[0]
+        if(len(negative) == 0):
+            break
+
+        master.addColumns(commodities[reachable][negative], [Path(paths[j][0], paths[j][1], np.sum(arcCosts[paths[j][1]])) for j in negative])
+
+    return iteration, objective, masterTime, time.time() - start
+
+
+if __name__ == '__main__':
+    maxIterations = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+
+    results = []
+    for name, path, capacityTypes, arcCapacity in instances:
+        instance = fromModule(path)
+        capacityNodes = np.array(capacityTypes, dtype=float)[np.asarray(instance.nodeTypes) - 1]
+        capacityArcs = arcCapacity(np.asarray(instance.arcCapacities))
+
+        for backend in backends:
+            try:
+                iterations, objective, masterTime, totalTime = runColumnGeneration(instance, capacityNodes, capacityArcs, backend, maxIterations)
+            except SolverError as e:
+                print(name, '---', backend, ': skipped (', e, ')')
+                continue
+
+            results.append((name, backend, iterations, objective, masterTime, totalTime))
+            print(name, '---', backend, ': ', iterations, 'iterations --- objective', objective, '--- master', round(masterTime, 3), 's --- total', round(totalTime, 3), 's')
+
+    print('\nINSTANCE\tBACKEND\tITERATIONS\tOBJECTIVE\tMASTER (s)\tTOTAL (s)')
+    for name, backend, iterations, objective, masterTime, totalTime in results:
+        print(name, '\t', backend, '\t', iterations, '\t', objective, '\t', round(masterTime, 3), '\t', round(totalTime, 3))
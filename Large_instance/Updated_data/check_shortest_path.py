@@ -0,0 +1,124 @@
+# --- CHECK THE SHORTEST PATH TOOLS AGAINST REFERENCE METHODS, ON SMALL RANDOM NETWORKS ---
+#
+# python check_shortest_path.py [number of networks]
+#
+# The networks have parallel arcs and zero-cost arcs. Each check compares a method of shortest_path.py with a
+# slower one whose result is known to be right :
+#   ShortestPathTree.remove : the repaired tree against Dijkstra's algorithm from scratch, with the deleted nodes/arcs blocked
+#   kShortestPaths : the k shortest loopless paths against the enumeration of all the loopless paths
+# Every mismatch is printed with the seed of its network, the script exits with status 1 if there is any.
+# (The module is the same in Medium_instance/Updated_data)
+
+import sys
+
+import numpy as np
+
+from shortest_path import Graph, shortestPaths, kShortestPaths, reverseGraph, ShortestPathTree
+
+
+def randomGraph(rng):
+    """ Return a random network : its CSR adjacency, and the starting node, ending node and cost of each arc (by arc_id) """
+    nStations = int(rng.integers(3, 8))
+    nArcs = int(rng.integers(nStations, 3 * nStations))
+    tails, heads = rng.integers(0, nStations, nArcs), rng.integers(0, nStations, nArcs)
+    loops = tails == heads
+    tails, heads = tails[~loops], heads[~loops]
+
+    parallel = rng.random(len(tails)) < 0.4 # Copy some arcs (same ends, other cost)
+    tails, heads = np.concatenate((tails, tails[parallel])), np.concatenate((heads, heads[parallel]))
+    costs = rng.integers(0, 5, len(tails)).astype(float) # (Some arcs cost 0)
+
+    arcIds = np.argsort(tails, kind='stable') # Group the arcs by starting node
+    offsets = np.zeros(nStations+1, dtype=int)
+    offsets[1:] = np.cumsum(np.bincount(tails, minlength=nStations))
+
+    return Graph(offsets, heads[arcIds], costs[arcIds], arcIds), tails, heads, costs
+
+def checkTreeRepair(rng):
+    """ Return the mismatches between a ShortestPathTree repaired after random deletions and Dijkstra's algorithm from scratch """
+    graph, tails, heads, costs = randomGraph(rng)
+    nStations = len(graph.offsets) - 1
+    origin = int(rng.integers(nStations))
+
+    tree = ShortestPathTree(origin, graph, reverseGraph(graph), graph.costs)
+    blockedNodes = np.zeros(nStations, dtype=bool)
+    blockedArcs = np.zeros(len(costs), dtype=bool)
+
+    errors = []
+    for step in range(3): # Deletions add up from one step to the next
+        nodes = [int(v) for v in rng.choice(nStations, int(rng.integers(0, 2)), replace=False) if v != origin]
+        arcs = [int(a) for a in rng.choice(len(costs), min(int(rng.integers(0, 3)), len(costs)), replace=False)]
+        blockedNodes[nodes] = True
+        blockedArcs[arcs] = True
+        tree.remove(nodes, arcs)
+
+        labels = shortestPaths(origin, graph, graph.costs, blockedNodes, blockedArcs)[0]
+        if(not np.array_equal(np.asarray(tree.labels), labels)):
+            errors.append('tree labels, step ' + str(step) + ' : ' + str(tree.labels) + ' instead of ' + str(labels.tolist()))
+            continue
+
+        for v in range(nStations): # The tree itself : each node is reached by an arc left in the network, at its label
+            a = tree.precedent_arcs[v]
+            if(v == origin or a < 0):
+                continue
+            if(blockedArcs[a] or blockedNodes[v] or tails[a] != tree.precedent_nodes[v] or heads[a] != v
+               or tree.labels[tree.precedent_nodes[v]] + costs[a] != tree.labels[v]):
+                errors.append('tree arc of node ' + str(v) + ', step ' + str(step))
+
+    return errors
+
+def allPaths(origin, destination, tails, heads, costs):
+    """ Return the (cost, arcs) of every loopless path from origin to destination, by depth-first enumeration """
+    paths = []
+    toTreat = [(origin, [origin], [], 0.0)] # Stack of (node, nodes of the path, arcs of the path, cost)
+    while toTreat:
+        currentNode, nodes, arcs, pathCost = toTreat.pop()
+        if(currentNode == destination):
+            paths.append((pathCost, arcs))
+            continue
+        for a in np.nonzero(tails == currentNode)[0]:
+            if(heads[a] not in nodes):
+                toTreat.append((heads[a], nodes + [heads[a]], arcs + [int(a)], pathCost + costs[a]))
+
+    return paths
+
+def checkKShortestPaths(rng, k = 6):
+    """ Return the mismatches between kShortestPaths and the enumeration of all the loopless paths """
+    graph, tails, heads, costs = randomGraph(rng)
+    nStations = len(graph.offsets) - 1
+    origin, destination = [int(v) for v in rng.choice(nStations, 2, replace=False)]
+
+    expected = sorted(float(pathCost) for pathCost, arcs in allPaths(origin, destination, tails, heads, costs))[:k]
+    paths = kShortestPaths(origin, destination, graph, graph.costs, k)
+
+    errors = []
+    if([pathCost for pathCost, nodes, arcs in paths] != expected):
+        errors.append('costs ' + str([pathCost for pathCost, nodes, arcs in paths]) + ' instead of ' + str(expected))
+    if(len(set(tuple(arcs) for pathCost, nodes, arcs in paths)) != len(paths)):
+        errors.append('the same path is returned twice')
+
+    for pathCost, nodes, arcs in paths: # Each path : loopless, its arcs follow its nodes, its cost is the sum of the arc costs
+        if(len(set(nodes)) != len(nodes) or origin in nodes or len(nodes) != len(arcs) or nodes[-1] != destination
+           or list(tails[arcs]) != [origin] + list(nodes[:-1]) or list(heads[arcs]) != list(nodes) or np.sum(costs[arcs]) != pathCost):
+            errors.append('invalid path ' + str(arcs))
+
+    return errors
+
+
+checks = [('ShortestPathTree.remove', checkTreeRepair),
+          ('kShortestPaths', checkKShortestPaths)]
+
+if __name__ == '__main__':
+    nNetworks = int(sys.argv[1]) if len(sys.argv) > 1 else 300
+
+    failed = False
+    for name, check in checks:
+        mismatches = 0
+        for seed in range(nNetworks):
+            for error in check(np.random.default_rng(seed)):
+                print(name, '--- network', seed, ':', error)
+                mismatches += 1
+        print(name, ':', nNetworks, 'networks ---', mismatches, 'mismatches')
+        failed = failed or mismatches > 0
+
+    sys.exit(1 if failed else 0)
@@ -2183,8 +2183,6 @@ def getNodes():
 	['S2172', 2172, 1] 
 	]
     
-    cost = getCosts(nStations)
-        
     return nStations, nodes
 
 def getArcs():
@@ -7941,3 +7939,19 @@ def getCosts(nStations):
         
     return cost
 
+
+def getGraph(nStations):
+    """
+     Return the compressed-sparse-row adjacency of the network : offsets, heads, costs, arcIds
+     The arcs leaving node i are stored at positions offsets[i] to offsets[i+1]-1 of the three other arrays
+     heads : ending node of the arc // costs : arc cost // arcIds : the corresponding arc_id
+    """
+    nArcs, arcs = getArcs()
+    arcs = np.array([row[:3] for row in arcs], dtype=int) # FromNode - ToNode - Length
+
+    arcIds = np.argsort(arcs[:, 0], kind='stable') # Group the arcs by starting node (keep the arc_id order inside a group)
+
+    offsets = np.zeros(nStations+1, dtype=int)
+    offsets[1:] = np.cumsum(np.bincount(arcs[:, 0] - 1, minlength=nStations))
+
+    return offsets, arcs[arcIds, 1] - 1, arcs[arcIds, 2], arcIds
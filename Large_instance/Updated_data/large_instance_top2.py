@@ -6,9 +6,6 @@ from __future__ import print_function
 import sys
 import time
 
-import cplex
-from cplex.exceptions import CplexSolverError
-
 import numpy as np
 np.set_printoptions(threshold=np.nan)
 
@@ -16,49 +13,24 @@ import openpyxl
 
 import cv2 # To find nonzero entry quickly
 
-from large_data2 import getNodes, getArcs, getCommodities, getCosts # python script to get the data
+from large_data2 import getNodes, getArcs, getCommodities, getGraph # python script to get the data
+from shortest_path import Graph, shortestPaths, reverseGraph, ShortestPathTree # Binary heap Dijkstra over a CSR adjacency
+from pricing import reducedCosts # Reduced cost of each arc
+from paths import Path, PathStore # Column pool, to reject duplicate paths
+from solvers import createLP, SolverError # LP backends (CPLEX, HiGHS)
+from master import RestrictedMaster, columnMatrix # Persistent restricted master problem
 
 
 def dijkstra(origin, cost):
     """ Return the shortest paths from origin
-        If mostUsedNode/mostUsedArc is not empty, delete the corresponding nodes/arc from the graph,
-        then compute the shortest paths from origin.
+        The graph and the cost vector are left untouched.
         
         origin : Station from which the method computes the shortest paths
-        cost : Adjency matrix, each entry contains : [cost between the two nodes, corresponding arc_id]
-        mostUsedNode : Nodes that will be ignored
-        mostUsedArc : Arcs that will be ignored
+        cost : Cost of each arc, in the order of the CSR adjacency
     """
 #   -------- DIJKSTRA'S ALGORITHM --------
-               
-    labels = np.full((nStations), np.inf) # Contains the cost of the shortest paths from origin with initial value = infinite
-    labels[origin] = 0
-
-    precedent_nodes = np.full((nStations), -1, dtype=int) # Contains the previous node of each node in the shortest paths
-    precedent_arcs = np.full((nStations), -1, dtype=int) # Contains the previous arc of each node in the shortest paths
-
-    toTreat = np.array([origin]) # Nodes that need to be processed
-
-    while True:
-        currentIndex = np.argmin(np.take(labels, toTreat)) # Pick the index in toTreat with the lowest value
-        currentNode = toTreat[currentIndex] # Pick the node with lowest shortest path distance from the set toTreat
-
-    #   neighbor = cv2.findNonZero((cost[currentNode, :, 0]>0).astype(np.uint8)).ravel()[1::2]
-        neighbor = np.nonzero(cost[currentNode, :, 0]>0)[0]
-        for i in neighbor: # For all neighbors of currentNode
-            if(labels[i] > labels[currentNode] + cost[currentNode, i, 0]): # If a better path if found
-
-                labels[i] = labels[currentNode] + cost[currentNode, i, 0] # Update the value
-                precedent_nodes[i] = currentNode # Get the node_id
-                precedent_arcs[i] = cost[currentNode, i, 1] # Get the arc_id
-                toTreat = np.append(toTreat, i) # As we found a better path to go to i, need to treat all the neighbors of i
 
-        toTreat = np.delete(toTreat, currentIndex) # Delete the node we just processed
-
-        if(toTreat.size == 0): # If there is no node left to treat, we are sure we obtained the best solution.
-            break
-
-    return labels, precedent_nodes, precedent_arcs
+    return shortestPaths(origin, graph, cost) # Binary heap Dijkstra over the CSR adjacency
 
 def getInitSet():
     """ Return a feasible set of inital variables.
@@ -67,28 +39,18 @@ def getInitSet():
     """
 #   -------- GET INITIAL SET OF PROMISSING VARIABLES --------
 
-    shortest_paths_origin = np.zeros((nStations, nStations), dtype=int)
-    previous_nodes_origin = np.zeros((nStations, nStations), dtype=int)
-    previous_arcs_origin = np.zeros((nStations, nStations), dtype=int)
-    
-    distance_done = set() # Nodes for which dijkstra's has already been run
+    trees = {} # Shortest path tree of each origin, repaired after each deletion of nodes/arcs
     iteration = 0 # Number of iteration over all commodities
 
-    toIgnore_node = set()
-    toIgnore_arc = set()
+    toIgnore_node = []
+    toIgnore_arc = []
 
     while(iteration < 5):
         
-        if(len(toIgnore_node) != 0): 
-            toIgnore_node = list(toIgnore_node) # Convert to list to iterate
-            for j in range(len(toIgnore_node)):
-                for i in range(nStations):
-                    cost[i, toIgnore_node[j], 0] = 0 # Disconnect the mostUsedNode from all others
-
-        if(len(toIgnore_arc) != 0):
-            toIgnore_arc = list(toIgnore_arc) # Convert to list to iterate
-            for j in range(len(toIgnore_arc)):
-                cost[ arc[toIgnore_arc[j]][0]-1 , arc[toIgnore_arc[j]][1]-1 , 0] = 0 # Disconnect the mostUsedArc from all others  
+        # Disconnect the mostUsedNode/mostUsedArc from all others (they stay deleted for the following iterations) :
+        # only the subtrees hanging below them are recomputed
+        for tree in trees.values():
+            tree.remove(toIgnore_node, toIgnore_arc)
                 
         
         for i in range(nCommodities): #Don't need the last node, if you have already find all the shortest path from every node except the last, you already computed the info for the last node
@@ -98,54 +60,47 @@ def getInitSet():
         
             if(iteration > 0):
                 #Check if mostUsedNode is in the global shortest path and isn't the destination of the commodity (Otherwise, no need to recompute shorest path)
-                if( (sum([pathsK_nodes[i][0][index] for index in toIgnore_node]) > 0 or sum([pathsK[i][0][index] for index in toIgnore_arc]) > 0) and commodities[i][1] not in toIgnore_node):
-                    shortest_paths, previous_nodes, previous_arcs = dijkstra(start, cost)
+                if( (np.isin(pathsK[i][0].nodes, toIgnore_node).any() or np.isin(pathsK[i][0].arcs, toIgnore_arc).any()) and commodities[i][1] not in toIgnore_node):
+                    shortest_paths, previous_nodes, previous_arcs = trees[start].labels, trees[start].precedent_nodes, trees[start].precedent_arcs
                         
                     if(previous_nodes[dest] != -1): # Check if the mostUsedNode deletion hasn't disconnected the destination from the origin
                         
-                        newPath_nodes = [0] * nStations
-                        newPath_arcs = [0] * nArcs
+                        route_nodes, route_arcs = [], [] # Nodes/arcs of the new path
                         
                         # Create the new path going backward
                         while(dest != start):
-                            newPath_nodes[dest] = 1 * commodities[i][2]
-                            newPath_arcs[previous_arcs[dest]] = 1 * commodities[i][2]
+                            route_nodes.append(dest)
+                            route_arcs.append(previous_arcs[dest])
                             
                             dest = previous_nodes[dest]
-    
-                        newPath_nodes.append( shortest_paths[commodities[i][1]] )
                         
-                        if(newPath_nodes not in pathsK_nodes[i]): # Check if the path is already taken into account
-                            pathsK_nodes[i].append(newPath_nodes)
-                            pathsK[i].append(newPath_arcs)
+                        pathsK.add(i, Path(route_nodes[::-1], route_arcs[::-1], shortest_paths[commodities[i][1]]), iteration) # Rejected if the path is already taken into account (O(1))
                             
             #Else : Just run Dijkstra's on whole graph
             else:
-                if(start not in distance_done): # If we haven't computed the shortest path from the commoditiy origin yet, do it
-                    shortest_paths_origin[start], previous_nodes_origin[start], previous_arcs_origin[start] = dijkstra(start, cost)
-                    distance_done.add(start)
+                if(start not in trees): # If we haven't computed the shortest path from the commoditiy origin yet, do it
+                    trees[start] = ShortestPathTree(start, graph, reverse, cost)
     
-                shortest_paths, previous_nodes, previous_arcs = shortest_paths_origin[start], previous_nodes_origin[start], previous_arcs_origin[start]
+                shortest_paths, previous_nodes, previous_arcs = trees[start].labels, trees[start].precedent_nodes, trees[start].precedent_arcs
     
-                newPath_nodes = [0] * nStations
-                newPath_arcs = [0] * nArcs
+                route_nodes, route_arcs = [], [] # Nodes/arcs of the path
                 
                 while(dest != start):
-                    newPath_nodes[dest] = 1 * commodities[i][2]
-                    newPath_arcs[previous_arcs[dest]] = 1 * commodities[i][2]
+                    route_nodes.append(dest)
+                    route_arcs.append(previous_arcs[dest])
                     
                     dest = previous_nodes[dest]
-            
-                newPath_nodes.append( shortest_paths[commodities[i][1]] ) #Append the cost
                 
-                pathsK_nodes[i].append(newPath_nodes)
-                pathsK[i].append(newPath_arcs)
+                pathsK.add(i, Path(route_nodes[::-1], route_arcs[::-1], shortest_paths[commodities[i][1]]), iteration) # The cost is the length of the path
+
+        if(phase_one): # The artificial variables of the master keep it feasible, no need to delete nodes/arcs
+            return pathsK
 
         # -- Check if RMP is feasible --
-        obj_Function = restricted_Master(pathsK_nodes, pathsK) #Solve the restricted master problem
+        obj_Function = restricted_Master(pathsK) #Solve the restricted master problem
 
         if(obj_Function != -1):
-            return pathsK_nodes, pathsK
+            return pathsK
 
         toIgnore_node, toIgnore_arc = getMostUsed()
         
@@ -156,182 +111,109 @@ def getMostUsed():
     """ Return the node liable to transport the biggest quantity minus its capacity
         (Probabilities a path is taken are equiprobable)
     """
-    # -- COUNT NODES --
-    count_node = np.zeros(nStations) # Contains the exceeding quantity for each node
-    for i in range(nStations):
-        count_node[i] = count_node[i] - capacity_node[node[i][2]-1]
-        for j in range(nCommodities):
-            total = len(pathsK_nodes[j])
-            for k in range(len(pathsK_nodes[j])):
-                count_node[i] += pathsK_nodes[j][k][i]/total # (Quantity of the commodity)*(Proba the path is choosen)
-                
-    print('Will be deleted :', count_node.argsort()[-2:][::-1].tolist(), 'with : ', np.sort(count_node)[-2:][::-1].tolist()) #Take the 3 most violated nodes
+    count_node = -np.array([capacity_node[row[2]-1] for row in node], dtype=float) # Contains the exceeding quantity for each node
+    count_arc = -np.array([row[3] for row in arc], dtype=float) # Contains the exceeding quantity for each arc
 
-    #   --- COUNT ARCS ---
-    count_arc = np.zeros(nArcs)
-    for i in range(nArcs):
-        count_arc[i] = count_arc[i] - arc[i][3]
-        for j in range(nCommodities):
-            total = len(pathsK[j])
-            for k in range(total):
-                count_arc[i] += pathsK[j][k][i]/total 
+    # -- COUNT NODES AND ARCS : only the nodes/arcs of each path are visited --
+    for j in range(nCommodities):
+        total = len(pathsK[j])
+        for path in pathsK[j]:
+            count_node[path.nodes] += commodities[j][2]/total # (Quantity of the commodity)*(Proba the path is choosen)
+            count_arc[path.arcs] += commodities[j][2]/total
 
+    print('Will be deleted :', count_node.argsort()[-2:][::-1].tolist(), 'with : ', np.sort(count_node)[-2:][::-1].tolist()) #Take the 3 most violated nodes
     print('Will be deleted :', count_arc.argsort()[-2:][::-1].tolist(), 'with : ', np.sort(count_arc)[-2:][::-1].tolist())
     
     return count_node.argsort()[-2:][::-1].tolist(), count_arc.argsort()[-2:][::-1].tolist()
     
-def dual_of_Restrited(pathsK_nodes, pathsK):
-    """ Return the dual variables of the restricted master problem
+def dual_of_Restrited(pathsK):
+    """ Return the dual variables of the restricted master problem, by solving its explicit dual
+        (Only used to validate the dual values read from the master, see validate_duals)
 
-        pathsK_nodes : Contains the considered paths(node-based) for each commodity
-        pathsK : Contains the considered paths(arc-based) for each commodity
+        pathsK : Contains the considered paths for each commodity
     """
 #   ------------- DUAL OF THE RESTRICTED MASTER PROBLEM -------------
     
-    model = cplex.Cplex() # Initialize the model
-    model.objective.set_sense(model.objective.sense.maximize) # Set the objective function to maximization
+    model = createLP(lp_backend, 'max') # Initialize the model, maximization
 
     # -- Add variables --
     # Correspond to the flow conservation constraints
-    for i in range(nCommodities):
-        model.variables.add(obj = [1], lb = [-cplex.infinity], ub = [cplex.infinity],#obj contains the coefficients of the decision variables in the objective function
-                            types = [model.variables.type.continuous],
-                            names = ['Y( K_' + str(i) + ')'])
-        
+    model.addColumns([1] * nCommodities, [-np.inf] * nCommodities, [np.inf] * nCommodities, # Coefficients of the decision variables in the objective function, bounds
+                     ['Y( K_' + str(i) + ')' for i in range(nCommodities)])
+
     # Correspond to the node capacity constraints 
-    for i in range(nStations):
-        model.variables.add(obj = [ capacity_node[node[i][2]-1] ], lb = [-cplex.infinity], ub = [0],
-                            types = [model.variables.type.continuous],
-                            names = ['Y( ' + str(node[i][0])  + ')'])
-        
+    model.addColumns([ capacity_node[node[i][2]-1] for i in range(nStations) ], [-np.inf] * nStations, [0] * nStations,
+                     ['Y( ' + str(node[i][0])  + ')' for i in range(nStations)])
+
     # Correspond to the arc capacity constraints 
-    for i in range(nArcs):
-        model.variables.add(obj = [ arc[i][3] ], lb = [-cplex.infinity], ub = [0],
-                            types = [model.variables.type.continuous],
-                            names = ['Y( ' + str(arc[i][0]-1) +','+ str(arc[i][1]-1) + ')'])
+    model.addColumns([ arc[i][3] for i in range(nArcs) ], [-np.inf] * nArcs, [0] * nArcs,
+                     ['Y( ' + str(arc[i][0]-1) +','+ str(arc[i][1]-1) + ')' for i in range(nArcs)])
         
     # -- Add constraints -- 
-    for i in range(nCommodities):
-        for j in range(len(pathsK_nodes[i])):
-            ind = []# Put the indices of the non-zero variables of the current constraint
-            val = []# Put their coefficients here
-            row = []
-            ind.append(i)
-            val.append(1)
-            for k in range(nStations):
-                if(pathsK_nodes[i][j][k] > 0): # Check which node is contained in the current paths (do not include starting node)
-                    ind.append(nCommodities+k)
-                    val.append(commodities[i][2])
-            for l in range(nArcs):
-                if(pathsK[i][j][l] > 0): # Check which arc is contained in the current paths
-                    ind.append(nCommodities+nStations+l)
-                    val.append(commodities[i][2])
-            row.append([ind, val])
-            model.linear_constraints.add(lin_expr = row,
-                                     senses = "L", #Less or equal than constraint
-                                     rhs = [ pathsK_nodes[i][j][nStations]*float(commodities[i][2]) ] ) # Right Hand Side of the constraint
+    # One per path : its coefficients are the column of the path in the restricted master, assembled at once from the nodes/arcs of the Path objects
+    forCommodity = [k for k in range(nCommodities) for path in pathsK[k]]
+    columns = columnMatrix(forCommodity, [path for k in range(nCommodities) for path in pathsK[k]], [row[2] for row in commodities], nStations, nArcs)
+    model.addRows("L" * columns.shape[1], [ path.cost*float(commodities[k][2]) for k in range(nCommodities) for path in pathsK[k] ], None, # Less or equal than constraints, Right Hand Side
+                  columns.T)
+
+    if(phase_one): # Correspond to the artificial variables
+        model.addRows("L" * nCommodities, [ artificial_cost*float(commodities[i][2]) for i in range(nCommodities) ], None,
+                      [([i], [1]) for i in range(nCommodities)])
 
     try:
         print("\n\n----------- RESTRICTED DUAL SOLUTION : -----------\n")
-        model.set_results_stream(None)
-        model.set_warning_stream(None)
         model.solve()
 #        model.write('test_dual.lp')
         
-    except CplexSolverError as e:
-        print("Exception raised during dual of restricted problem: " + e)
+    except SolverError as e:
+        print("Exception raised during dual of restricted problem: ", e)
 
     # Return the dual variables corresponding to the commodities, arcs and nodes constraints
-    return model.solution.get_values()[:nCommodities] , model.solution.get_values()[nCommodities:nCommodities+nStations], model.solution.get_values()[nCommodities+nStations:]
+    values = model.getValues().tolist()
+    return values[:nCommodities] , values[nCommodities:nCommodities+nStations], values[nCommodities+nStations:]
 
-def restricted_Master(pathsK_nodes, pathsK):
-    """ Return the solution to the restricted master problem, as well as, the dual variables
+def restricted_Master(pathsK):
+    """ Return the solution to the restricted master problem, as well as, the dual variables (read from the same solve)
+        The model persists between two calls : the paths added since the last call are appended to it as new columns,
+        then it is re-solved starting from the previous basis
 
-        pathsK_nodes : Contains the considered paths(node-based) for each commodity
-        pathsK : Contains the considered paths(arc-based) for each commodity
+        pathsK : Contains the considered paths for each commodity
     """
     
 #   ------------- SOLVE THE RESTRICTED MASTER PROBLEM -------------
-        
-    model = cplex.Cplex() # Initialize the model
-    model.objective.set_sense(model.objective.sense.minimize) ## Set the objective function to minimization
-    
-    # -- Add variables
-    for i in range(nCommodities):
-        for j in range(len(pathsK_nodes[i])):
-            model.variables.add(obj = [pathsK_nodes[i][j][nStations]*float(commodities[i][2])], lb = [0], ub = [1],#obj contains the coefficients of the decision variables in the objective function                               
-                                types = [model.variables.type.continuous],
-                                names = ['P(' + str(i) + ',' + str(j) + ')']) 
 
-    # -- Add constraints -- 
-    #Flow conservation constraints :
-    count = 0 # To iterate over the indices of the decision variables
+    # -- Add the new variables --
+    forCommodity, newPaths = [], []
     for i in range(nCommodities):
-        ind = [] # Put the indices of the non-zero variables of the current constraint
-        val = [] # Put their coefficients here
-        row = []
-        for j in range(len(pathsK_nodes[i])):
-            ind.append(count) 
-            val.append(1)
-            count += 1
-        row.append([ind, val])
-        model.linear_constraints.add(lin_expr = row,
-                                     senses = "E", #Equality constraint
-                                     rhs = [1] ) # Right Hand Side of the constraint
- 
-    #Node capacity constraints :
-    for i in range(nStations): 
-        ind, val, row = [], [], []
-        count = 0
-        for j in range(nCommodities): #For each commodity path, check each time a path contains the node (do not include starting node)
-            for k in range(len(pathsK_nodes[j])):
-                if(pathsK_nodes[j][k][i] > 0): # If it is the case, add the decision variable index to the constraint
-                    ind.append(count)
-                    val.append(commodities[j][2]) # With its coefficiant
-                count += 1
-        row.append([ind, val])
-        model.linear_constraints.add(lin_expr = row,
-                                     senses = "L", # Less-than
-                                     rhs = [ capacity_node[node[i][2]-1] ] ) #Capacity of the node (-1 because type_id start at 1)
-
-    #Arc capacity constraints :
-    for i in range(nArcs): 
-        ind, val, row = [], [], []
-        count = 0
-        for j in range(nCommodities): #For each commodity path, check each time a path contains the node (do not include starting node)
-            for k in range(len(pathsK[j])):
-                if(pathsK[j][k][i] > 0): # If it is the case, add the decision variable index to the constraint
-                    ind.append(count)
-                    val.append(commodities[j][2]) # With its coefficiant
-                count += 1
-        row.append([ind, val])
-        model.linear_constraints.add(lin_expr = row,
-                                     senses = "L", # Less-than
-                                     rhs = [ arc[i][3] ] ) #Capacity of the node (-1 because type_id start at 1)
+        for j in range(master.countPaths(i), len(pathsK[i])): # Paths which are not in the model yet
+            forCommodity.append(i)
+            newPaths.append(pathsK[i][j])
+    master.addColumns(forCommodity, newPaths)
         
     try:
         print("\n\n----------- RESTRICTED MASTER SOLUTION : -----------\n")
-        model.set_results_stream(None)
-        model.set_warning_stream(None)
-        model.solve()
-#        model.write('test_restricted.lp')
+        obj_Function, solution = master.solve()
+#        master.model.write('test_restricted.lp')
         print("\n")
-#        print("Solution primal : ",model.solution.get_values())
+#        print("Solution primal : ",solution)
         
 #        #Print the solution
 #        count = 0
 #        for i in range(nCommodities):
-#            for j in range(len(pathsK_nodes[i])):
+#            for j in range(len(pathsK[i])):
 #                
-#                indices = [k for k, x in enumerate(pathsK_nodes[i][j]) if (x > 0 and k < nStations)] #Get the indices of the nodes contained in the current path
-#
-#                print("\t", model.solution.get_values(count)*commodities[i][2] ,"units of commodity n°", i+1 ,"on path", node[commodities[i][0]][0],''
-#                      + ' '.join([node[k][0] for k in indices]) + ". Length path : " + str(pathsK_nodes[i][j][nStations]) )
+#                print("\t", solution[count]*commodities[i][2] ,"units of commodity n°", i+1 ,"on path", node[commodities[i][0]][0],''
+#                      + ' '.join([node[k][0] for k in pathsK[i][j].nodes]) + ". Length path : " + str(pathsK[i][j].cost) )
 #                count += 1
                 
-        print("\nTotal cost = " + str(model.solution.get_objective_value()))
+        print("\nTotal cost = " + str(obj_Function))
         
-        dualCommodities, dualStations, dualArcs = dual_of_Restrited(pathsK_nodes, pathsK) # Compute the dual variables and print them
+        dualCommodities, dualStations, dualArcs = master.getDuals() # Dual values of the rows of the master, from the same solve
+
+        if(validate_duals): # Solve the explicit dual of the restricted master as well, both objective values must match
+            explicitDuals = dual_of_Restrited(pathsK)
+            print("Dual objective (master duals) = " + str(master.dualObjective(dualCommodities, dualStations, dualArcs))
+                  + " --- Dual objective (explicit dual) = " + str(master.dualObjective(*explicitDuals)))
         
         print()
 #        for i in range(len(dualCommodities)):
@@ -346,11 +228,11 @@ def restricted_Master(pathsK_nodes, pathsK):
 #            if(dualArcs[i] != 0):
 #                print("Dual values y_Arc" + str(i) + " = "+ str(dualArcs[i]))
             
-    except CplexSolverError as e:
+    except SolverError as e:
         print("Exception raised during restricted master problem: ", e)
         return -1
 
-    return model.solution.get_objective_value(), model.solution.get_values(), dualCommodities, dualStations, dualArcs
+    return obj_Function, solution, dualCommodities, dualStations, dualArcs
 
 def pricingProblem(dualCommodities, dualStations, dualArcs): 
     """ Return the paths corresponding to the most negative reduced cost of each commodity
@@ -364,22 +246,14 @@ def pricingProblem(dualCommodities, dualStations, dualArcs):
     reducedCost = 0 # Contains a negative value if we found a path with negative reduced cost
     
     forCommodity = [] # id of the commodity which will receive the new paths, if any
-    bestPath_nodes = [] # Contains the paths which will be added (node_id's and cost)
-    bestPath_arcs = [] # Contains the paths which will be added (arc_id's)
-
-    shortest_from_node = np.full((nStations, nStations), np.inf) # Total cost of the shortest path from index
-    previous_nodes = np.full((nStations, nStations), -1, dtype=int) # Nodes id to go backward
-    previous_arcs = np.full((nStations, nStations), -1, dtype=int) # Arc id to go backward
-
-    # -- Compute the new cost vector -- 
-    cost_for_commo = getCosts(nStations)
-    for i in range(nStations):
-        for j in np.nonzero(cost_for_commo[i,:,0])[0]:
-                cost_for_commo[i,j,0] = cost_for_commo[i,j,0] - dualStations[j]
-                
-    for i in np.nonzero(dualArcs)[0]:
-        if(cost_for_commo[ arc[i][0]-1, arc[i][1]-1, 0 ] > 0): 
-            cost_for_commo[ arc[i][0]-1, arc[i][1]-1, 0 ] = cost_for_commo[ arc[i][0]-1, arc[i][1]-1, 0 ] - dualArcs[i]
+    bestPaths = [] # Contains the paths which will be added
+
+    shortest_from_node = {} # Total cost of the shortest path from each origin
+    previous_nodes = {} # Nodes id to go backward
+    previous_arcs = {} # Arc id to go backward
+
+    # -- Compute the new cost vector (one entry per arc, in the order of the CSR adjacency) -- 
+    cost_for_commo = reducedCosts(graph, dualStations, dualArcs)
             
     # -- Run Dijkstra's -- 
     for i in range(nCommodities): #Solve the shortest path problem (with updated cost) for each commodity
@@ -387,37 +261,36 @@ def pricingProblem(dualCommodities, dualStations, dualArcs):
         origin = commodities[i][0]
         dest = commodities[i][1]
         
-        if( np.array_equal(previous_nodes[origin], np.full((nStations), -1, dtype=int)) ): # Haven't run Dijkstra yet for this origin
+        if(origin not in previous_nodes): # Haven't run Dijkstra yet for this origin
             shortest_from_node[origin], previous_nodes[origin], previous_arcs[origin] = dijkstra(origin, cost_for_commo)
                           
-        currentReducedCost = (shortest_from_node[origin, dest] * commodities[i][2]) - dualCommodities[i] #Compute the reducedCost
+        currentReducedCost = (shortest_from_node[origin][dest] * commodities[i][2]) - dualCommodities[i] #Compute the reducedCost
         
         if(currentReducedCost < 0):
             
             # -- Construct the new path --
-            newPath_nodes = [0] * (nStations+1)
-            newPath_arcs = [0] * nArcs
+            route_nodes, route_arcs = [], []
+            pathCost = 0
             
             # By going backward from destination
             while(dest != origin):
-                newPath_nodes[dest] = 1 * commodities[i][2]
-                newPath_nodes[nStations] += arc[previous_arcs[origin, dest]][2] # Compute the cost on the fly
+                pathCost += arc[previous_arcs[origin][dest]][2] # Compute the cost on the fly
                 
-                newPath_arcs[previous_arcs[origin, dest]] = 1 * commodities[i][2]
+                route_nodes.append(dest)
+                route_arcs.append(previous_arcs[origin][dest])
 
-                dest = previous_nodes[origin, dest]
+                dest = previous_nodes[origin][dest]
 
             reducedCost = round(currentReducedCost) # Round to avoid computational mistake (10^-23 instead of 0)
             forCommodity.append(i) 
-            bestPath_nodes.append(newPath_nodes)
-            bestPath_arcs.append(newPath_arcs)
+            bestPaths.append(Path(route_nodes[::-1], route_arcs[::-1], pathCost))
         
         print("\n\n----------- PRICING PROBLEM SOLUTION FOR COMMODITY n°", i+1 ,": -----------\n")
         #Print reduced cost for the current commodity
         print()
         print("\n\tREDUCED COST : ", currentReducedCost)
         
-    return reducedCost, bestPath_nodes, forCommodity, bestPath_arcs
+    return reducedCost, bestPaths, forCommodity
                    
 # ------------- DATA ------------- 
 
@@ -426,33 +299,54 @@ s_time_loading_data = time.time() # Time - 0 Start loading data
 nStations, node = getNodes() # Get the nodes
 nArcs, arc = getArcs() # Get the arcs
 nCommodities, commodities = getCommodities() # Get the commodities
-cost = getCosts(nStations) # Get the cost adjency matrix
+graph = Graph(*getGraph(nStations)) # Get the CSR adjacency of the network
+reverse = reverseGraph(graph) # CSR adjacency of the reversed network, to repair the shortest path trees
+cost = graph.costs.astype(float) # Cost of each arc, in the order of the CSR adjacency
 
 scale_capacity = 1/8 # Variable used to scale up or down the capacity of the arcs
 arc = [[row[0], row[1], row[2], row[3]*scale_capacity] for row in arc] # Update arc capacities
 
+lp_backend = 'cplex' # Solver of the linear programs : 'cplex', or 'highs' (HiGHS through scipy, no licence needed)
+
+phase_one = False # Start from the shortest path of each commodity, an artificial variable per commodity keeps the master feasible (False : delete the most used nodes/arcs until it is)
+artificial_cost = sum(row[2] for row in arc) # Big-M : cost of a unit of commodity on its artificial variable (longer than any path)
+
+validate_duals = False # Also solve the explicit dual of each restricted master problem, to check the dual values
+
 capacity_node = [10000, 700, 700, 1400] # Define a capacity value for each type of node
 
 t_time_loading_data = time.time() # Time - 1 Start searching for feasible solution
 
 # ------------- ALGORITHM -------------
 
-#pathsK_nodes[k,i,j] with k = commodity_id // i = path_id of commodity k // j = node_id of the path 
-pathsK_nodes = [[] for i in range(nCommodities)] # Contains all initial paths for each commodity (by nodes)
+#pathsK[k][i] with k = commodity_id // i = path_id of commodity k : nodes, arcs and cost of the path
+pathsK = PathStore(nCommodities) # Contains all the paths of each commodity, keyed by their arcs to reject duplicates
 
-#pathsK[k,i,j] with k = commodity_id // i = path_id of commodity k // j = arc_id of the path 
-pathsK = [[] for i in range(nCommodities)] # Contains all initial paths for each commodity (by arcs)
+master = RestrictedMaster([row[2] for row in commodities], [capacity_node[row[2]-1] for row in node], [row[3] for row in arc],
+                          artificial_cost if phase_one else 0, lp_backend) # Restricted master problem, kept across the iterations (and the feasibility checks of getInitSet)
 
-pathsK_nodes, pathsK = getInitSet() # Get the initial set of variable through Dijkstra and "route through best possible shortest path" method
+pathsK = getInitSet() # Get the initial set of variable through Dijkstra and "route through best possible shortest path" method
 
 t_time_init_set = time.time() # Time - 2 Start optimizing the problem
 
+iteration = 0 # Number of column generation iterations (getInitSet's paths are born at iterations 0 to 4)
+
 while True:
     
-    obj_Function, solution, dualCommodities, dualStations, dualArcs = restricted_Master(pathsK_nodes, pathsK) #Solve the restricted master problem
-    reducedCost, newPath, forCommodity, newPath_arc = pricingProblem(dualCommodities, dualStations, dualArcs) #Solve the pricing problem
+    iteration += 1
+    obj_Function, solution, dualCommodities, dualStations, dualArcs = restricted_Master(pathsK) #Solve the restricted master problem
+    reducedCost, newPath, forCommodity = pricingProblem(dualCommodities, dualStations, dualArcs) #Solve the pricing problem
     
-    if(round(reducedCost) == 0): # round to avoid minor computational error (10^-23 for 0)
+    added = 0 # Number of new paths actually added
+    if(round(reducedCost) != 0): # Add the new paths to the restricted set (duplicates are rejected)
+        for j in range(len(newPath)):
+            added += pathsK.add(forCommodity[j], newPath[j], 5 + iteration)
+
+        stats = pathsK.stats()
+        print("\nCOLUMN POOL : ", stats['paths'], "paths --- ", added, "added at iteration", iteration, "--- ",
+              stats['duplicates'], "duplicates rejected --- at most", stats['max_per_commodity'], "paths for a commodity")
+
+    if(added == 0): # No path with a negative reduced cost (round to avoid minor computational error, 10^-23 for 0), or only duplicates
         
         t_time_solving = time.time() # Time - 3 Algorithm terminates
         
@@ -460,24 +354,20 @@ while True:
         count = 0
         for i in range(nCommodities):
             print()
-            for j in range(len(pathsK_nodes[i])):
+            for j in range(len(pathsK[i])):
                 
-                indices = [k for k, x in enumerate(pathsK_nodes[i][j]) if (x > 0 and k < nStations) ] #Get the indices of the arcs contained in the current path
-
                 print("\t", solution[count]*commodities[i][2] ,"units of commodity n°", i+1 ,"on path", node[commodities[i][0]][0],''
-                      + ' '.join([node[k][0] for k in indices]) + ". Length path : " + str(pathsK_nodes[i][j][nStations]) )
+                      + ' '.join([node[k][0] for k in pathsK[i][j].nodes]) + ". Length path : " + str(pathsK[i][j].cost) )
                 count += 1
                 
         print("\nTotal cost = " + str(obj_Function))
+        if(phase_one): # Quantity left on the artificial variables
+            unrouted = np.dot(master.unrouted, [row[2] for row in commodities])
+            if(unrouted > 1e-6): # Some commodities can't be routed within the capacities
+                print("INFEASIBLE : ", unrouted, "units left on the artificial variables (or artificial_cost is too small)")
         print("\nLoading data duration : ", t_time_loading_data - s_time_loading_data)
         print("Finding initial set duration : ", t_time_init_set - t_time_loading_data)
         print("Solving problem duration : ", t_time_solving - t_time_init_set)
         print("\nTotal duration : ", t_time_solving - s_time_loading_data)
         break
-    
-    else: # Add the new paths to the restricted set
-        
-        for j in range(len(newPath)):
-            pathsK_nodes[forCommodity[j]].append(newPath[j])
-            pathsK[forCommodity[j]].append(newPath_arc[j])
             
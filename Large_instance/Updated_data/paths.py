@@ -0,0 +1,101 @@
+                    # ------------- SPARSE STORAGE OF THE PATHS (COLUMNS OF THE RESTRICTED MASTER) -------------
+
+import numpy as np
+
+
+class Path(object):
+    """ A path of a commodity : only the nodes and arcs it goes through are stored """
+    __slots__ = ('nodes', 'arcs', 'cost')
+
+    def __init__(self, nodes, arcs, cost):
+        """ nodes : node_id's of the path, from the origin to the destination (the origin itself is excluded)
+            arcs : arc_id's of the path, in the same order
+            cost : Cost of the path in the original network
+        """
+        self.nodes = np.asarray(nodes, dtype=np.int32)
+        self.arcs = np.asarray(arcs, dtype=np.int32)
+        self.cost = cost
+
+class PathStore(object):
+    """ Column pool : paths considered for each commodity (pathsK[k][j] : path j of commodity k)
+        Each commodity keeps a dictionary keyed by the arcs of its paths, a duplicate is rejected in O(1).
+        The iteration at which each path was added (born) is recorded.
+        The retired paths are kept in an archive : a retired path generated again is recovered from it (and flagged as restored).
+    """
+    __slots__ = ('paths', 'keys', 'born', 'restored', 'duplicates', 'archive', 'retired', 'recovered')
+
+    def __init__(self, nCommodities):
+        self.paths = [[] for i in range(nCommodities)]
+        self.keys = [{} for i in range(nCommodities)] # Key of each path -> its index in paths
+        self.born = [[] for i in range(nCommodities)] # Iteration at which each path was added
+        self.restored = [[] for i in range(nCommodities)] # True for each path recovered from the archive
+        self.duplicates = 0 # Number of rejected paths
+        self.archive = [{} for i in range(nCommodities)] # Key of each retired path -> the path
+        self.retired = 0 # Number of retired paths
+        self.recovered = 0 # Number of retired paths added again
+
+    def __getitem__(self, commodity):
+        return self.paths[commodity]
+
+    def __len__(self):
+        return len(self.paths)
+
+    def add(self, commodity, path, iteration = 0):
+        """ Add a path to the commodity, unless the commodity already has it
+            Return True if the path was added, False if it was a duplicate
+
+            commodity : Commodity of the path
+            path : Path to add
+            iteration : Current iteration of the column generation
+        """
+        key = pathKey(path)
+        if(key in self.keys[commodity]):
+            self.duplicates += 1
+            return False
+
+        restored = key in self.archive[commodity]
+        if(restored): # The path was retired, take it back from the archive
+            path = self.archive[commodity].pop(key)
+            self.recovered += 1
+
+        self.keys[commodity][key] = len(self.paths[commodity])
+        self.paths[commodity].append(path)
+        self.born[commodity].append(iteration)
+        self.restored[commodity].append(restored)
+        return True
+
+    def retire(self, commodity, positions):
+        """ Move paths of the commodity to the archive (the following paths of the commodity are shifted)
+
+            commodity : Commodity of the paths
+            positions : Positions of the paths to retire
+        """
+        positions = set(positions)
+        for j in positions:
+            path = self.paths[commodity][j]
+            self.archive[commodity][pathKey(path)] = path
+
+        self.paths[commodity] = [path for j, path in enumerate(self.paths[commodity]) if j not in positions]
+        self.born[commodity] = [born for j, born in enumerate(self.born[commodity]) if j not in positions]
+        self.restored[commodity] = [restored for j, restored in enumerate(self.restored[commodity]) if j not in positions]
+        self.keys[commodity] = dict((pathKey(path), j) for j, path in enumerate(self.paths[commodity]))
+        self.retired += len(positions)
+
+    def stats(self):
+        """ Return the statistics of the pool : number of paths, largest number of paths of a commodity,
+            number of rejected duplicates, number of paths born at each iteration,
+            number of paths in the archive, number of retired and recovered paths
+        """
+        born = np.array([iteration for commodity in self.born for iteration in commodity], dtype=int)
+
+        return {'paths': len(born),
+                'max_per_commodity': max(len(paths) for paths in self.paths) if len(self.paths) > 0 else 0,
+                'duplicates': self.duplicates,
+                'born_per_iteration': np.bincount(born).tolist(),
+                'archived': sum(len(archive) for archive in self.archive),
+                'retired': self.retired,
+                'recovered': self.recovered}
+
+def pathKey(path):
+    """ Return the key identifying a path in the pool : the bytes of its sorted arc_id's (a simple path is defined by its arcs) """
+    return np.sort(path.arcs).tobytes()
@@ -0,0 +1,263 @@
+                    # ------------- LINEAR PROGRAMMING BACKENDS (CPLEX, HIGHS) -------------
+
+# Both backends expose the same model : rows and columns are added (with their coefficients) in any order,
+# columns can be deleted, and a solve gives the objective value, the primal values, the reduced costs and the row duals.
+# The bounds use np.inf for an unbounded side, the senses of the rows are 'E', 'L' or 'G'.
+# The coefficients of new rows/columns are either a list of (indices, values), or a scipy.sparse matrix loaded in bulk.
+#
+#   CplexLP : the model lives in CPLEX, a new solve starts from the last basis (warm start)
+#   HighsLP : the model is kept as sparse triplets and solved by scipy.optimize.linprog(method='highs'), no licence needed
+#             (linprog always solves from scratch : no warm start)
+
+import numpy as np
+import scipy.sparse
+from scipy.optimize import linprog
+
+try:
+    import cplex
+    from cplex.exceptions import CplexSolverError
+except ImportError: # Only the HiGHS backend is available
+    cplex = None
+
+
+class SolverError(Exception):
+    """ Raised when a backend can't solve the model or read its solution (e.g. infeasible model) """
+
+
+def sparseVectors(matrix, axis):
+    """ Return the (indices, values) of each row (axis = 0) or each column (axis = 1) of a scipy.sparse matrix """
+    matrix = matrix.tocsr() if axis == 0 else matrix.tocsc()
+    return [(matrix.indices[matrix.indptr[j]:matrix.indptr[j+1]], matrix.data[matrix.indptr[j]:matrix.indptr[j+1]])
+            for j in range(matrix.shape[axis])]
+
+
+def createLP(backend, sense = 'min', primal = False):
+    """ Return an empty linear program of the backend
+
+        backend : 'cplex' or 'highs'
+        sense : 'min' or 'max'
+        primal : Solve with the primal simplex (CPLEX), suited to a model growing by columns
+    """
+    if(backend == 'cplex'):
+        return CplexLP(sense, primal)
+    if(backend == 'highs'):
+        return HighsLP(sense)
+
+    raise ValueError("Unknown LP backend : " + str(backend))
+
+
+class CplexLP(object):
+    """ Linear program solved by CPLEX """
+
+    def __init__(self, sense = 'min', primal = False):
+        if(cplex is None):
+            raise SolverError("CPLEX is not installed, use the 'highs' backend")
+
+        self.model = cplex.Cplex() # Initialize the model
+        self.model.objective.set_sense(self.model.objective.sense.minimize if sense == 'min' else self.model.objective.sense.maximize)
+        self.model.set_results_stream(None)
+        self.model.set_warning_stream(None)
+        if(primal):
+            self.model.parameters.lpmethod.set(self.model.parameters.lpmethod.values.primal) # Adding columns keeps the basis primal feasible
+
+    def nRows(self):
+        """ Return the number of rows """
+        return self.model.linear_constraints.get_num()
+
+    def nColumns(self):
+        """ Return the number of columns """
+        return self.model.variables.get_num()
+
+    def addRows(self, senses, rhs, names = None, rows = None):
+        """ Add rows to the model
+
+            senses : Sense of each row ('E', 'L' or 'G')
+            rhs : Right hand side of each row
+            names : Name of each row (None : no name)
+            rows : Coefficients of each row, (column indices, values), or a scipy.sparse matrix (new rows x columns) (None : empty rows)
+        """
+        arguments = {'senses': ''.join(senses), 'rhs': [float(value) for value in rhs]}
+        if(names is not None):
+            arguments['names'] = list(names)
+        if(scipy.sparse.issparse(rows)):
+            rows = sparseVectors(rows, 0)
+        if(rows is not None):
+            arguments['lin_expr'] = [cplex.SparsePair(ind = np.asarray(ind).tolist(), val = np.asarray(val, dtype=float).tolist()) for ind, val in rows]
+        self.model.linear_constraints.add(**arguments)
+
+    def addColumns(self, obj, lb, ub, names = None, columns = None):
+        """ Add columns (variables) to the model
+
+            obj : Objective coefficient of each column
+            lb, ub : Bounds of each column (np.inf : unbounded)
+            names : Name of each column (None : no name)
+            columns : Coefficients of each column, (row indices, values), or a scipy.sparse matrix (rows x new columns) (None : empty columns)
+        """
+        arguments = {'obj': [float(value) for value in obj],
+                     'lb': np.clip(np.asarray(lb, dtype=float), -cplex.infinity, cplex.infinity).tolist(),
+                     'ub': np.clip(np.asarray(ub, dtype=float), -cplex.infinity, cplex.infinity).tolist()}
+        if(names is not None):
+            arguments['names'] = list(names)
+        if(scipy.sparse.issparse(columns)):
+            columns = sparseVectors(columns, 1)
+        if(columns is not None):
+            arguments['columns'] = [cplex.SparsePair(ind = np.asarray(ind).tolist(), val = np.asarray(val, dtype=float).tolist()) for ind, val in columns]
+        if(len(arguments['obj']) > 0):
+            self.model.variables.add(**arguments)
+
+    def deleteColumns(self, indices):
+        """ Remove columns from the model (the following columns are shifted) """
+        self.model.variables.delete([int(index) for index in indices])
+
+    def solve(self):
+        """ Solve the model, starting from the last basis """
+        try:
+            self.model.solve()
+        except CplexSolverError as e:
+            raise SolverError(str(e))
+
+    def _read(self, getter):
+        """ Return a value of the solution, a SolverError is raised if there is no solution """
+        try:
+            return getter()
+        except CplexSolverError as e:
+            raise SolverError(str(e))
+
+    def getObjective(self):
+        """ Return the objective value of the last solve """
+        return self._read(self.model.solution.get_objective_value)
+
+    def getValues(self):
+        """ Return the value of each column """
+        return np.array(self._read(self.model.solution.get_values))
+
+    def getReducedCosts(self):
+        """ Return the reduced cost of each column """
+        return np.array(self._read(self.model.solution.get_reduced_costs))
+
+    def getDuals(self):
+        """ Return the dual value of each row """
+        return np.array(self._read(self.model.solution.get_dual_values))
+
+    def write(self, path):
+        """ Write the model to a file (e.g. 'test_restricted.lp') """
+        self.model.write(path)
+
+class HighsLP(object):
+    """ Linear program solved by HiGHS, through scipy.optimize.linprog
+        The coefficients are kept as (row, column, value) triplets, the matrix is assembled at each solve.
+        The duals and reduced costs follow the CPLEX sign convention (derivative of the objective value).
+    """
+
+    def __init__(self, sense = 'min'):
+        self.sign = 1.0 if sense == 'min' else -1.0 # linprog minimizes
+        self.obj, self.lb, self.ub = np.zeros(0), np.zeros(0), np.zeros(0)
+        self.senses, self.rhs = np.zeros(0, dtype='U1'), np.zeros(0)
+        self.rowIndex, self.columnIndex, self.values = [np.zeros(0, dtype=int)], [np.zeros(0, dtype=int)], [np.zeros(0)]
+        self.solution = None
+
+    def nRows(self):
+        return len(self.rhs)
+
+    def nColumns(self):
+        return len(self.obj)
+
+    def _triplets(self):
+        """ Return the (row, column, value) arrays of all the coefficients """
+        if(len(self.values) > 1):
+            self.rowIndex, self.columnIndex, self.values = [np.concatenate(self.rowIndex)], [np.concatenate(self.columnIndex)], [np.concatenate(self.values)]
+        return self.rowIndex[0], self.columnIndex[0], self.values[0]
+
+    def _append(self, major, minor, vectors, first):
+        """ Append the coefficients of new rows/columns : entry j of vectors is (indices, values) of major index first+j
+            (vectors can also be a scipy.sparse matrix, with one row per major index)
+        """
+        if(scipy.sparse.issparse(vectors)):
+            vectors = vectors.tocoo()
+            major.append(vectors.row + first)
+            minor.append(vectors.col)
+            self.values.append(vectors.data.astype(float))
+            return
+
+        counts = [len(ind) for ind, val in vectors]
+        majorIndex = np.repeat(np.arange(first, first + len(vectors)), counts)
+        minorIndex = np.concatenate([np.asarray(ind, dtype=int) for ind, val in vectors]) if len(vectors) > 0 else np.zeros(0, dtype=int)
+        values = np.concatenate([np.asarray(val, dtype=float) for ind, val in vectors]) if len(vectors) > 0 else np.zeros(0)
+        major.append(majorIndex)
+        minor.append(minorIndex)
+        self.values.append(values)
+
+    def addRows(self, senses, rhs, names = None, rows = None):
+        """ Add rows to the model (see CplexLP.addRows, the names are ignored) """
+        first = self.nRows()
+        self.senses = np.concatenate((self.senses, np.array(list(senses), dtype='U1')))
+        self.rhs = np.concatenate((self.rhs, np.asarray(rhs, dtype=float)))
+        if(rows is not None):
+            self._append(self.rowIndex, self.columnIndex, rows, first)
+
+    def addColumns(self, obj, lb, ub, names = None, columns = None):
+        """ Add columns to the model (see CplexLP.addColumns, the names are ignored) """
+        first = self.nColumns()
+        self.obj = np.concatenate((self.obj, np.asarray(obj, dtype=float)))
+        self.lb = np.concatenate((self.lb, np.asarray(lb, dtype=float)))
+        self.ub = np.concatenate((self.ub, np.asarray(ub, dtype=float)))
+        if(scipy.sparse.issparse(columns)):
+            columns = columns.T # One row per new column
+        if(columns is not None):
+            self._append(self.columnIndex, self.rowIndex, columns, first)
+
+    def deleteColumns(self, indices):
+        """ Remove columns from the model (the following columns are shifted) """
+        remove = np.zeros(self.nColumns(), dtype=bool)
+        remove[np.asarray(indices, dtype=int)] = True
+        newIndex = np.cumsum(~remove) - 1 # Index of each remaining column
+
+        rowIndex, columnIndex, values = self._triplets()
+        kept = ~remove[columnIndex]
+        self.rowIndex, self.columnIndex, self.values = [rowIndex[kept]], [newIndex[columnIndex[kept]]], [values[kept]]
+        self.obj, self.lb, self.ub = self.obj[~remove], self.lb[~remove], self.ub[~remove]
+
+    def solve(self):
+        """ Solve the model from scratch, a SolverError is raised if no optimal solution is found """
+        rowIndex, columnIndex, values = self._triplets()
+        matrix = scipy.sparse.csr_matrix((values, (rowIndex, columnIndex)), shape = (self.nRows(), self.nColumns()))
+
+        equal, less, greater = self.senses == 'E', self.senses == 'L', self.senses == 'G'
+        upper = less | greater # The 'G' rows are multiplied by -1
+        rowSign = np.where(greater, -1.0, 1.0)
+
+        result = linprog(self.sign * self.obj,
+                         A_ub = scipy.sparse.diags(rowSign[upper]) @ matrix[upper] if upper.any() else None,
+                         b_ub = (rowSign * self.rhs)[upper] if upper.any() else None,
+                         A_eq = matrix[equal] if equal.any() else None,
+                         b_eq = self.rhs[equal] if equal.any() else None,
+                         bounds = np.column_stack((self.lb, self.ub)), method = 'highs')
+        if(result.status != 0):
+            self.solution = None
+            raise SolverError(result.message)
+
+        duals = np.zeros(self.nRows())
+        if(upper.any()):
+            duals[upper] = self.sign * rowSign[upper] * result.ineqlin.marginals
+        if(equal.any()):
+            duals[equal] = self.sign * result.eqlin.marginals
+
+        self.solution = (self.sign * result.fun, result.x, self.obj - matrix.T @ duals, duals)
+
+    def _read(self, entry):
+        """ Return an entry of the solution, a SolverError is raised if there is no solution """
+        if(self.solution is None):
+            raise SolverError("No solution available")
+        return self.solution[entry]
+
+    def getObjective(self):
+        return self._read(0)
+
+    def getValues(self):
+        return self._read(1)
+
+    def getReducedCosts(self):
+        return self._read(2)
+
+    def getDuals(self):
+        return self._read(3)
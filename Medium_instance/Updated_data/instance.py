@@ -0,0 +1,138 @@
+                    # ------------- BINARY INSTANCE FORMAT (ONE .npy FILE PER COLUMN) -------------
+
+# An instance is a directory holding one .npy file per column of the data :
+#   nodeNames, nodeIds, nodeTypes : one entry per node
+#   arcTails, arcHeads, arcCosts, arcCapacities : one entry per arc (NodeId starts at 1, as in the data modules)
+#   origins, destinations, quantities : one entry per commodity (NodeId starts at 0, as in the data modules)
+# The files are memory-mapped when loaded : no column is read before it is used, nor copied.
+#
+# Convert a python data module :    python instance.py large_data.py large_instance
+
+import os
+import sys
+import shutil
+import importlib.util
+from collections import namedtuple
+
+import numpy as np
+
+Instance = namedtuple('Instance', ['nodeNames', 'nodeIds', 'nodeTypes',
+                                   'arcTails', 'arcHeads', 'arcCosts', 'arcCapacities',
+                                   'origins', 'destinations', 'quantities'])
+
+
+def saveInstance(directory, instance):
+    """ Write each column of the instance to its own .npy file
+
+        directory : Directory of the binary instance (created if needed)
+        instance : Columns of the instance
+    """
+    if(not os.path.isdir(directory)):
+        os.makedirs(directory)
+
+    for field, column in zip(Instance._fields, instance):
+        np.save(os.path.join(directory, field + '.npy'), np.ascontiguousarray(column))
+
+class ColumnWriter(object):
+    """ Write one column of a binary instance chunk by chunk, when its number of entries isn't known in advance
+        The chunks are appended to a raw file, which becomes the .npy file once the column is closed.
+    """
+
+    def __init__(self, directory, field, dtype):
+        """ directory : Directory of the binary instance (created if needed)
+            field : Name of the column (one of the fields of Instance)
+            dtype : Type of the entries
+        """
+        if(not os.path.isdir(directory)):
+            os.makedirs(directory)
+
+        self.path = os.path.join(directory, field + '.npy')
+        self.dtype = np.dtype(dtype)
+        self.count = 0 # Number of entries written so far
+        self.raw = open(self.path + '.part', 'wb')
+
+    def append(self, values):
+        """ Write the next entries of the column """
+        chunk = np.asarray(values, dtype=self.dtype)
+        chunk.tofile(self.raw)
+        self.count += len(chunk)
+
+    def close(self):
+        """ Write the .npy file : header (now that the number of entries is known) followed by the raw entries """
+        self.raw.close()
+        with open(self.path, 'wb') as column:
+            np.lib.format.write_array_header_1_0(column, {'descr': np.lib.format.dtype_to_descr(self.dtype),
+                                                          'fortran_order': False, 'shape': (self.count,)})
+            with open(self.path + '.part', 'rb') as raw:
+                shutil.copyfileobj(raw, column)
+        os.remove(self.path + '.part')
+
+def loadInstance(directory):
+    """ Return the columns of the instance, memory-mapped (read only)
+
+        directory : Directory of the binary instance
+    """
+    return Instance(*[np.load(os.path.join(directory, field + '.npy'), mmap_mode='r') for field in Instance._fields])
+
+def fromModule(path):
+    """ Return the columns of the instance of a python data module (getNodes, getArcs and getCommodities)
+
+        path : Path to the data module, e.g. large_data.py
+    """
+    spec = importlib.util.spec_from_file_location(os.path.splitext(os.path.basename(path))[0], path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+
+    nStations, nodes = module.getNodes()
+    nArcs, arcs = module.getArcs()
+    nCommodities, commodities = module.getCommodities()
+
+    return Instance(np.array([str(row[0]) for row in nodes]), # Names, IDs and types of the nodes
+                    np.array([row[1] for row in nodes], dtype=np.int32),
+                    np.array([row[2] for row in nodes], dtype=np.int8),
+                    np.array([row[0] for row in arcs], dtype=np.int32), # FromNode - ToNode - Length - Capacity of the arcs
+                    np.array([row[1] for row in arcs], dtype=np.int32),
+                    np.array([row[2] for row in arcs]),
+                    np.array([row[3] for row in arcs]),
+                    np.array([row[0] for row in commodities], dtype=np.int32), # From - To - Quantity of the commodities
+                    np.array([row[1] for row in commodities], dtype=np.int32),
+                    np.array([row[2] for row in commodities]))
+
+def getInstanceGraph(instance):
+    """ Return the compressed-sparse-row adjacency of the network : offsets, heads, costs, arcIds (same as getGraph() of the data modules)
+
+        instance : Columns of the instance
+    """
+    nStations = len(instance.nodeIds)
+    tails = np.asarray(instance.arcTails) - 1
+
+    arcIds = np.argsort(tails, kind='stable') # Group the arcs by starting node (keep the arc_id order inside a group)
+
+    offsets = np.zeros(nStations+1, dtype=int)
+    offsets[1:] = np.cumsum(np.bincount(tails, minlength=nStations))
+
+    return offsets, np.asarray(instance.arcHeads)[arcIds] - 1, np.asarray(instance.arcCosts)[arcIds], arcIds
+
+def getLists(instance):
+    """ Return the data in the layout of the python data modules : nStations, nodes, nArcs, arcs, nCommodities, commodities
+        nodes : NodeName - NodeID - NodeType - Outdegree // arcs : FromNode - ToNode - Length - Capacity // commodities : From - To - Quantity
+
+        instance : Columns of the instance
+    """
+    nStations, nArcs, nCommodities = len(instance.nodeIds), len(instance.arcTails), len(instance.origins)
+
+    outdegree = np.bincount(np.asarray(instance.arcHeads) - 1, minlength=nStations) # Same value as getNodes() of the data modules
+
+    nodes = [list(row) for row in zip(instance.nodeNames.tolist(), instance.nodeIds.tolist(), instance.nodeTypes.tolist(), outdegree.tolist())]
+    arcs = [list(row) for row in zip(instance.arcTails.tolist(), instance.arcHeads.tolist(), instance.arcCosts.tolist(), instance.arcCapacities.tolist())]
+    commodities = [list(row) for row in zip(instance.origins.tolist(), instance.destinations.tolist(), instance.quantities.tolist())]
+
+    return nStations, nodes, nArcs, arcs, nCommodities, commodities
+
+
+if __name__ == '__main__':
+    if(len(sys.argv) != 3):
+        print('Usage : python instance.py <data module, e.g. large_data.py> <directory of the binary instance>')
+        sys.exit(1)
+
+    saveInstance(sys.argv[2], fromModule(sys.argv[1]))
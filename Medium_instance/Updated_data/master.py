@@ -0,0 +1,234 @@
+                    # ------------- PERSISTENT RESTRICTED MASTER PROBLEM -------------
+
+import numpy as np
+import scipy.sparse
+
+from solvers import createLP
+
+
+class RestrictedMaster(object):
+    """ Restricted master problem kept in memory during the whole column generation
+        Its rows (flow conservation, node capacities, arc capacities) are created once,
+        each new path is appended as a column and the LP backend re-solves the model (from its previous basis with CPLEX).
+        The columns left unused for a long time can be removed from the model (see purge()).
+        In Phase-I mode, an artificial column per commodity (on its flow conservation row only, penalized by a Big-M cost)
+        keeps the model feasible whatever the paths : they come first in the model and are never removed.
+        With lazy rows, a capacity row is only put in the model once the paths could violate it (before the first solve)
+        or once a solution violates it : the solve is repeated until no capacity is violated (the duals of the other rows are 0).
+
+        Rows : [flow conservation of each commodity] + [capacity of each node] + [capacity of each arc] (the capacity rows in the model, see activeRows)
+    """
+
+    def __init__(self, quantities, capacityNodes, capacityArcs, artificialCost = 0, backend = 'cplex', lazyRows = False):
+        """ quantities : Quantity of each commodity
+            capacityNodes : Capacity of each node
+            capacityArcs : Capacity of each arc
+            artificialCost : Cost of a unit of commodity on its artificial column (0 : no artificial column)
+            backend : LP backend, 'cplex' or 'highs' (see solvers.py)
+            lazyRows : Only add the capacity rows which are (or could be) violated
+        """
+        self.nCommodities = len(quantities)
+        self.nStations = len(capacityNodes)
+        self.quantities = quantities
+        self.capacityNodes = np.asarray(capacityNodes, dtype=float)
+        self.capacityArcs = np.asarray(capacityArcs, dtype=float)
+
+        self.columns = [[] for i in range(self.nCommodities)] # Index of the variables of each commodity, in the order they were added
+        self.nColumns = 0
+        self.nNamed = 0 # Number of columns ever added (keeps the names unique once some columns are removed)
+        self.ages = np.zeros(0, dtype=int) # Number of consecutive solves each variable stayed at 0 with a positive reduced cost
+        self.pinned = np.zeros(0, dtype=bool) # Variables never removed by purge
+        self.nArtificials = self.nCommodities if artificialCost > 0 else 0 # Number of artificial variables, placed before the paths
+        self.unrouted = np.zeros(self.nCommodities) # Share of each commodity left on its artificial column by the last solve
+
+        self.capacities = np.concatenate((self.capacityNodes, self.capacityArcs)) # Right hand side of the capacity rows (nodes then arcs)
+        self.lazyRows = lazyRows
+        self.activeRows = np.zeros(0, dtype=int) # Capacity row of each row of the model after the flow conservation rows
+        self.inModel = np.zeros(len(self.capacities), dtype=bool) # Capacity rows in the model
+        self.capacityMatrix = scipy.sparse.csc_matrix((len(self.capacities), 0)) # Coefficients of the paths in all the capacity rows (lazy rows)
+        self.nSolves = 0
+
+        self.model = createLP(backend, 'min', primal = True) # Initialize the model, minimization (adding columns keeps the basis primal feasible)
+
+        # -- Add constraints --
+        self.model.addRows("E" * self.nCommodities, [1] * self.nCommodities, # Flow conservation constraints
+                           ['K_' + str(i) for i in range(self.nCommodities)])
+        if(not lazyRows): # Node capacity constraints, then arc capacity constraints
+            self.addCapacityRows(np.arange(len(self.capacities)))
+
+        if(self.nArtificials > 0): # -- Add the artificial variables (Phase-I) --
+            self.model.addColumns([float(artificialCost) * float(quantity) for quantity in quantities],
+                                  [0] * self.nCommodities, [np.inf] * self.nCommodities,
+                                  ['A(' + str(k) + ')' for k in range(self.nCommodities)],
+                                  [([k], [1.0]) for k in range(self.nCommodities)])
+
+    def addCapacityRows(self, rows):
+        """ Add capacity rows to the model, with the coefficients of the paths already in it
+
+            rows : Capacity rows to add (node_id's, then len(capacityNodes) + arc_id's)
+        """
+        rows = np.asarray(rows, dtype=int)
+        names = [('Node_' + str(i)) if i < self.nStations else ('Arc_' + str(i - self.nStations)) for i in rows.tolist()]
+
+        coefficients = None # (No column yet)
+        if(self.lazyRows and self.nColumns > 0):
+            coefficients = scipy.sparse.hstack((scipy.sparse.csr_matrix((len(rows), self.nArtificials)), self.capacityMatrix.tocsr()[rows]), format = 'csr')
+
+        self.model.addRows("L" * len(rows), self.capacities[rows], names, coefficients)
+        self.activeRows = np.concatenate((self.activeRows, rows))
+        self.inModel[rows] = True
+
+    def countPaths(self, commodity):
+        """ Return the number of paths of the commodity already in the model """
+        return len(self.columns[commodity])
+
+    def addColumns(self, forCommodity, paths, pinned = None):
+        """ Append new paths to the model, one column each (the existing columns and rows are left untouched)
+            The columns are assembled at once from the node and arc arrays of the paths, and loaded in a single call
+
+            forCommodity : Commodity of each path
+            paths : Paths to add
+            pinned : True for each path purge must never remove, e.g. a path already retired once (None : none)
+        """
+        forCommodity = np.asarray(forCommodity, dtype=int)
+        if(len(forCommodity) == 0):
+            return
+
+        quantities = np.asarray(self.quantities, dtype=float)[forCommodity]
+        obj = np.array([float(path.cost) for path in paths]) * quantities
+        names = ['P(' + str(k) + ',' + str(self.nNamed + j) + ')' for j, k in enumerate(forCommodity.tolist())]
+
+        for j, k in enumerate(forCommodity.tolist()):
+            self.columns[k].append(self.nColumns + j)
+        self.nColumns += len(forCommodity)
+        self.nNamed += len(forCommodity)
+        self.ages = np.concatenate((self.ages, np.zeros(len(forCommodity), dtype=int)))
+        self.pinned = np.concatenate((self.pinned, np.zeros(len(forCommodity), dtype=bool) if pinned is None else np.asarray(pinned, dtype=bool)))
+
+        matrix = columnMatrix(forCommodity, paths, self.quantities, self.nStations, len(self.capacityArcs))
+        if(self.lazyRows): # Keep the coefficients of the capacity rows which aren't in the model yet
+            self.capacityMatrix = scipy.sparse.hstack((self.capacityMatrix, matrix[self.nCommodities:]), format = 'csc')
+            matrix = matrix.tocsr()[np.concatenate((np.arange(self.nCommodities), self.nCommodities + self.activeRows))]
+
+        # No upper bound : x <= 1 is implied by the flow conservation row, and a bound would take part of the dual information away from the rows
+        self.model.addColumns(obj, np.zeros(len(obj)), np.full(len(obj), np.inf), names, matrix)
+
+    def solve(self):
+        """ Re-solve the model (warm started from the last basis)
+            Return the objective value and the value of each variable, ordered by commodity then by path
+            The age of each variable is updated : +1 if it is at 0 with a positive reduced cost, reset to 0 otherwise
+            (The values of the artificial variables are kept in unrouted)
+            With lazy rows, the violated capacity rows are added and the model is solved again, until no capacity is violated
+        """
+        if(self.lazyRows and self.nSolves == 0): # Start with the rows the paths could violate : sum of the quantities of the commodities using them
+            self.addCapacityRows(np.nonzero(~self.inModel & (self.potentialLoad() > self.capacities + 1e-9))[0])
+        self.nSolves += 1
+
+        self.model.solve()
+        while(self.lazyRows):
+            load = self.capacityMatrix @ self.model.getValues()[self.nArtificials:] # Load of every capacity row (vectorized check)
+            violated = np.nonzero(~self.inModel & (load > self.capacities + 1e-6 * np.maximum(1, self.capacities)))[0]
+            if(len(violated) == 0):
+                break
+
+            self.addCapacityRows(violated)
+            self.model.solve()
+
+        values = self.model.getValues()
+        reducedCosts = self.model.getReducedCosts()
+        if(self.nArtificials > 0):
+            self.unrouted = values[:self.nArtificials]
+            values, reducedCosts = values[self.nArtificials:], reducedCosts[self.nArtificials:]
+
+        unused = (values <= 1e-9) & (reducedCosts > 1e-9)
+        self.ages = np.where(unused, self.ages + 1, 0)
+
+        ordered = values[[index for k in range(self.nCommodities) for index in self.columns[k]]]
+
+        return self.model.getObjective(), ordered.tolist()
+
+    def purge(self, maxAge, maxColumns):
+        """ Remove the columns unused for a long time from the model
+            Return the position of the removed paths of each commodity (commodity -> sorted positions)
+            Only non-basic variables at 0 are removed, and never the pinned ones. The duals of a warm started solve (CPLEX)
+            stay the same, but a backend solving from scratch (HiGHS) can return another degenerate dual solution,
+            under which a removed path prices out again : pinning the paths already retired once prevents the cycling.
+
+            maxAge : Remove the columns unused for at least maxAge consecutive solves (0 : no age limit)
+            maxColumns : If more columns remain, remove the oldest unused ones as well (0 : no size limit)
+        """
+        remove = ((self.ages >= maxAge) if maxAge > 0 else np.zeros(self.nColumns, dtype=bool)) & ~self.pinned
+
+        extra = self.nColumns - np.count_nonzero(remove) - maxColumns # Columns above the size limit
+        if(maxColumns > 0 and extra > 0):
+            candidates = np.nonzero((self.ages > 0) & ~remove & ~self.pinned)[0] # Only unused columns can be removed
+            oldest = candidates[np.argsort(-self.ages[candidates], kind='stable')[:extra]]
+            remove[oldest] = True
+
+        if(not remove.any()):
+            return {}
+
+        removed = {}
+        newIndex = np.cumsum(~remove) - 1 # Index of each remaining variable once the others are deleted
+        for k in range(self.nCommodities):
+            positions = [j for j, index in enumerate(self.columns[k]) if remove[index]]
+            if(len(positions) > 0):
+                removed[k] = positions
+            self.columns[k] = [int(newIndex[index]) for index in self.columns[k] if not remove[index]] # (Every commodity : the indices after a removed column shift)
+
+        self.model.deleteColumns(np.nonzero(remove)[0] + self.nArtificials)
+        if(self.lazyRows):
+            self.capacityMatrix = self.capacityMatrix[:, np.nonzero(~remove)[0]]
+        self.ages = self.ages[~remove]
+        self.pinned = self.pinned[~remove]
+        self.nColumns = len(self.ages)
+
+        return removed
+
+    def getDuals(self):
+        """ Return the dual values of the last solve : flow conservation rows, node capacity rows, arc capacity rows """
+        duals = self.model.getDuals()
+        capacityDuals = np.zeros(len(self.capacities)) # (0 for the rows which aren't in the model)
+        capacityDuals[self.activeRows] = duals[self.nCommodities:]
+
+        return duals[:self.nCommodities].tolist(), capacityDuals[:self.nStations].tolist(), capacityDuals[self.nStations:].tolist()
+
+    def potentialLoad(self):
+        """ Return the largest load of each capacity row for the paths in the model : sum of the quantities of the commodities with a path using it """
+        matrix = self.capacityMatrix.tocoo()
+        commodity = np.zeros(self.nColumns, dtype=int)
+        for k in range(self.nCommodities):
+            commodity[self.columns[k]] = k
+
+        pairs = np.unique(matrix.row * self.nCommodities + commodity[matrix.col]) # Distinct (row, commodity)
+        return np.bincount(pairs // self.nCommodities, weights = np.asarray(self.quantities, dtype=float)[pairs % self.nCommodities],
+                           minlength = len(self.capacities))
+
+    def dualObjective(self, dualCommodities, dualStations, dualArcs):
+        """ Return the objective value of the dual of the restricted master for the given dual values """
+        return np.sum(dualCommodities) + np.dot(self.capacityNodes, dualStations) + np.dot(self.capacityArcs, dualArcs)
+
+def columnMatrix(forCommodity, paths, quantities, nStations, nArcs):
+    """ Return the coefficients of the paths in the rows of the restricted master, one column per path (scipy.sparse CSC matrix)
+        Column j : 1 on the flow conservation row of its commodity, the quantity of the commodity on the capacity rows of its nodes and arcs
+
+        forCommodity : Commodity of each path
+        paths : Paths
+        quantities : Quantity of each commodity
+        nStations, nArcs : Number of nodes and arcs of the network
+    """
+    forCommodity = np.asarray(forCommodity, dtype=int)
+    nCommodities = len(quantities)
+    columns = np.arange(len(forCommodity))
+    pathQuantities = np.asarray(quantities, dtype=float)[forCommodity]
+
+    nodeCounts = np.array([len(path.nodes) for path in paths], dtype=int)
+    arcCounts = np.array([len(path.arcs) for path in paths], dtype=int)
+    nodes = np.concatenate([path.nodes for path in paths] + [np.zeros(0, dtype=int)])
+    arcs = np.concatenate([path.arcs for path in paths] + [np.zeros(0, dtype=int)])
+
+    rows = np.concatenate((forCommodity, nCommodities + nodes, nCommodities + nStations + arcs))
+    cols = np.concatenate((columns, np.repeat(columns, nodeCounts), np.repeat(columns, arcCounts)))
+    values = np.concatenate((np.ones(len(forCommodity)), np.repeat(pathQuantities, nodeCounts), np.repeat(pathQuantities, arcCounts)))
+
+    return scipy.sparse.csc_matrix((values, (rows, cols)), shape = (nCommodities + nStations + nArcs, len(forCommodity)))
@@ -6,66 +6,34 @@ from __future__ import print_function
 import sys
 import time
 
-import cplex
-from cplex.exceptions import CplexSolverError
-
 import numpy as np
 np.set_printoptions(threshold=np.nan)
 
 import openpyxl
 
-from medium_data import getNodes, getArcs, getCommodities, getCosts # python script to get the data
+from medium_data import getNodes, getArcs, getCommodities, getGraph # python script to get the data
+from instance import loadInstance, getInstanceGraph, getLists # Binary instance format
+from shortest_path import Graph, getPositions, shortestPaths, aStar, kShortestPaths, reverseGraph # Binary heap Dijkstra over a CSR adjacency
+from pricing import reducedCosts, groupByOrigin, extractPaths, TreePool # Tools to solve the pricing problem
+from master import RestrictedMaster, columnMatrix # Persistent restricted master problem
+from solvers import createLP, SolverError # LP backends (CPLEX, HiGHS)
+from paths import Path, PathStore # Sparse storage of the paths
+from stabilization import DualSmoothing # Stabilization of the dual values
 
 
-def dijkstra(origin, cost, mostUsedNode, mostUsedArc):
+def dijkstra(origin, cost, blockedNodes, blockedArcs, targets = None):
     """ Return the shortest paths from origin
-        If mostUsedNode/mostUsedArc is not empty, delete the corresponding nodes/arc from the graph,
-        then compute the shortest paths from origin.
+        The blocked nodes/arcs are ignored, the graph and the cost vector are left untouched.
         
         origin : Station from which the method computes the shortest paths
-        cost : Adjency matrix, each entry contains : [cost between the two nodes, corresponding arc_id]
-        mostUsedNode : Nodes that will be ignored
-        mostUsedArc : Arcs that will be ignored
+        cost : Cost of each arc, in the order of the CSR adjacency
+        blockedNodes : Boolean mask by node_id of the nodes that will be ignored (None : no node)
+        blockedArcs : Boolean mask by arc_id of the arcs that will be ignored (None : no arc)
+        targets : Stop once the shortest paths to these nodes are known (None : compute all the shortest paths)
     """
 #   -------- DIJKSTRA'S ALGORITHM --------
 
-    # -- Delete nodes/arcs if any given -- 
-    if(len(mostUsedNode) != 0): 
-        mostUsedNode = list(mostUsedNode) # Convert to list to iterate
-        for j in range(len(mostUsedNode)):
-            for i in range(nStations):
-                cost[i, mostUsedNode[j], 0] = 0 # Disconnect the mostUsedNode from all others
-
-    if(len(mostUsedArc) != 0):
-        mostUsedArc = list(mostUsedArc) # Convert to list to iterate
-        for j in range(len(mostUsedArc)):
-            cost[ arc[mostUsedArc[j]][0]-1 , arc[mostUsedArc[j]][1]-1 , 0] = 0 # Disconnect the mostUsedArc from all others  
-                
-    labels = np.full((nStations), np.inf) # Contains the cost of the shortest paths from origin with initial value = infinite
-    labels[origin] = 0
-    
-    precedent_nodes = np.full((nStations), -1, dtype=int) # Contains the previous node of each node in the shortest paths
-    precedent_arcs = np.full((nStations), -1, dtype=int) # Contains the previous arc of each node in the shortest paths
-    
-    toTreat = np.array([origin]) # Nodes that need to be processed
-
-    while True:
-        currentNode = toTreat[np.argmin(np.take(labels, toTreat))] # Pick the node with lowest shortest path distance from the set toTreat
-
-        for i in np.nonzero(cost[currentNode, :, 0])[0]: # For all neighbors of currentNode
-            if(labels[i] > labels[currentNode] + cost[currentNode, i, 0]): # If a better path if found
-                    
-                labels[i] = labels[currentNode] + cost[currentNode, i, 0] # Update the value
-                precedent_nodes[i] = currentNode # Get the node_id
-                precedent_arcs[i] = cost[currentNode, i, 1] # Get the arc_id
-                toTreat = np.append(toTreat, i) # As we found a better path to go to i, need to treat all the neighbors of i
-
-        toTreat = np.delete(toTreat,np.where(toTreat==currentNode)[0]) # Delete the node we just processed
-        
-        if(toTreat.size == 0): # If there is no node left to treat, we are sure we obtained the best solution.
-            break
-
-    return labels, precedent_nodes, precedent_arcs
+    return shortestPaths(origin, graph, cost, blockedNodes, blockedArcs, targets) # Binary heap Dijkstra over the CSR adjacency
 
 def getInitSet():
     """ Return a feasible set of inital variables : Greedy algorithm
@@ -87,9 +55,9 @@ def getInitSet():
 
     #   -------- GET INITIAL SET OF PROMISSING VARIABLES --------
 
-    shortest_paths_original = np.zeros((nStations, nStations), dtype=int) # Represent the shortest path distance between each nodes in the original network
-    previous_nodes_original = np.zeros((nStations, nStations), dtype=int) # Represent the previous node of each node of the shortest path from index
-    previous_arcs_original = np.zeros((nStations, nStations), dtype=int) # Represent the previous arc of each node of the shortest path from index
+    shortest_paths_original = {} # Represent the shortest path distance from each origin in the original network
+    previous_nodes_original = {} # Represent the previous node of each node of the shortest path from each origin
+    previous_arcs_original = {} # Represent the previous arc of each node of the shortest path from each origin
 
     distance_done = set() # Nodes for which dijkstra's algorithm has already been run
     sorting = 0 # Number of iteration over all commodities
@@ -99,21 +67,24 @@ def getInitSet():
     
     while(sorting < 5): # If we haven't iterate too much over the commodities (otherwise : consider the problem unfeasible)
 
-        current_capacities_nodes = [capacity_node[index] for index in [row[2]-1 for row in node]] # To verify the capacities of the nodes are not violated
-        current_capacities_arcs = [row[3] for row in arc] # To verify the capacities of the arcs are not violated
+        current_capacities_nodes = np.array([capacity_node[index] for index in [row[2]-1 for row in node]], dtype=float) # To verify the capacities of the nodes are not violated
+        current_capacities_arcs = np.array([row[3] for row in arc], dtype=float) # To verify the capacities of the arcs are not violated
 
-        pathsK_nodes = [[] for i in range(nCommodities)] # ReInitialize pathsK_nodes
-        pathsK = [[] for i in range(nCommodities)] # ReInitialize pathsK
+        pathsK = PathStore(nCommodities) # ReInitialize pathsK
 
         unfeasible = False # Equals True if we found a unfeasible commodity
         count = 0
+
+        blocked_nodes = np.zeros(nStations, dtype=bool) # Nodes violated for the current commodity, ignored by dijkstra's algorithm
+        blocked_arcs = np.zeros(nArcs, dtype=bool) # Arcs violated for the current commodity
         
         for i in sortedCommo:
             count += 1
             print('COMMODITY N°', i+1, ' ---  ITERATION N°', count)
             
             not_add = 0 # Boolean variable, to know if we can take the original shortest path value
-            current_cost = np.copy(cost) # ReInitialize the cost matrix
+            blocked_nodes[:] = False # Unblock the nodes/arcs of the previous commodity
+            blocked_arcs[:] = False
             
             to_Ignore_node = set() # Contains the nodes violated for the current commodity
             to_Ignore_arc = set() # Contains the arcs violated for the current commodity
@@ -125,14 +96,14 @@ def getInitSet():
                 if(sorting == 0): # 1st iteration -> Compute the shortest path
                     if(start not in distance_done):
 
-                        shortest_paths_original[start], previous_nodes_original[start], previous_arcs_original[start] = dijkstra(start, current_cost, to_Ignore_node, to_Ignore_arc)
+                        shortest_paths_original[start], previous_nodes_original[start], previous_arcs_original[start] = dijkstra(start, cost, None, None)
                         distance_done.add(start)
                         
                     #Set the current shortest path values   
                     shortest_paths, previous_nodes, previous_arcs = shortest_paths_original[start], previous_nodes_original[start], previous_arcs_original[start]
 
                 elif(not_add == 1): # A node/arc has to be ignored, re-run dijkstra's algorithm
-                    shortest_paths, previous_nodes, previous_arcs = dijkstra(start, current_cost, to_Ignore_node, to_Ignore_arc)
+                    shortest_paths, previous_nodes, previous_arcs = dijkstra(start, cost, blocked_nodes, blocked_arcs)
 
                 else: # If no nodes/arcs have to be ignored, take the original shortest path value
                     shortest_paths, previous_nodes, previous_arcs = shortest_paths_original[start], previous_nodes_original[start], previous_arcs_original[start]
@@ -143,8 +114,8 @@ def getInitSet():
                     to_Ignore_arc = set()
 
                     # -- Generate the new path --
-                    newPath_nodes = [0] * nStations # New path based on node_id
-                    newPath_arcs = [0] * nArcs # New path based on arc_id
+                    newPath_nodes = [] # node_id's of the new path (from the destination)
+                    newPath_arcs = [] # arc_id's of the new path
                 
                     # By going backward from destination
                     while(dest != start):
@@ -162,18 +133,22 @@ def getInitSet():
                         if(sorting == 0): # During the 1st iteration, compute the outdegree of the current path
                             outdegree[i] += node[ previous_nodes[dest] ][3]
                             
-                        newPath_nodes[dest] = 1 * commodities[i][2] # Update the pathway value
-                        newPath_arcs[previous_arcs[dest]] = 1 * commodities[i][2]
+                        newPath_nodes.append(dest) # Update the pathway
+                        newPath_arcs.append(previous_arcs[dest])
                         
                         dest = previous_nodes[dest] # Go backward
     
                     if(len(to_Ignore_node) == 0 and len(to_Ignore_arc) == 0): # We found a feasible path for the current commodity
                         
-                        current_capacities_nodes = np.subtract(current_capacities_nodes, np.asarray(newPath_nodes))
-                        current_capacities_arcs = np.subtract(current_capacities_arcs, np.asarray(newPath_arcs))
+                        current_capacities_nodes[newPath_nodes] -= commodities[i][2]
+                        current_capacities_arcs[newPath_arcs] -= commodities[i][2]
+
+                        pathsK.add(i, Path(newPath_nodes[::-1], newPath_arcs[::-1], shortest_paths[commodities[i][1]])) # Path with its cost
                         break # Go to the next commodity
                 
                     else: # We violated a capacity constraint, recompute shortest path without them
+                        blocked_nodes[list(to_Ignore_node)] = True
+                        blocked_arcs[list(to_Ignore_arc)] = True
                         if(not_add == 0):
                             not_add = 1 # Do not take the original shortest path anymore
 
@@ -185,11 +160,7 @@ def getInitSet():
                     print('UNFEASIBLE')
                     print()
                     break
-    
-            newPath_nodes.append( shortest_paths[commodities[i][1]] ) # Append the cost of the path found
-            pathsK_nodes[i].append(newPath_nodes)
-            
-            pathsK[i].append(newPath_arcs)
+
                 
         if(sorting == 0): #Sort the commodities indices by their shortest path outdegree
             sortedCommo = np.argsort(outdegree)
@@ -197,160 +168,124 @@ def getInitSet():
         sorting += 1
         
         if(unfeasible == False and sorting > 1):
-            return pathsK_nodes, pathsK
-    
-def dual_of_Restrited(pathsK_nodes, pathsK):
-    """ Return the dual variables of the restricted master problem
+            return pathsK
 
-        pathsK_nodes : Contains the considered paths(node-based) for each commodity
-        pathsK : Contains the considered paths(arc-based) for each commodity
+def getShortestPathSet():
+    """ Return the initial set of variables of the Phase-I mode : the shortest path of each commodity in the original network
+        The capacities may be violated, the artificial columns of the master keep it feasible until the pricing drives them out
+        (A commodity without any path only has its artificial column)
+    """
+    labels = np.full((len(originsK), nStations), np.inf) # Shortest path tree of each distinct origin
+    precedents_node = np.full((len(originsK), nStations), -1, dtype=int)
+    precedents_arc = np.full((len(originsK), nStations), -1, dtype=int)
+    for j in range(len(originsK)):
+        labels[j], precedents_node[j], precedents_arc[j] = dijkstra(originsK[j], cost, None, None, destinationsK[commoditiesByOrigin[j]])
+
+    pathNodes, pathArcs = extractPaths(treeK, destinationsK, precedents_node, precedents_arc)
+
+    pathsK = PathStore(nCommodities)
+    for k in range(nCommodities):
+        if(np.isfinite(labels[treeK[k], destinationsK[k]])):
+            steps = pathArcs[k] >= 0 # (The paths were read backward from the destination)
+            pathsK.add(k, Path(pathNodes[k][steps][::-1], pathArcs[k][steps][::-1], labels[treeK[k], destinationsK[k]]))
+
+    return pathsK
+
+def dual_of_Restrited(pathsK):
+    """ Return the dual variables of the restricted master problem, by solving its explicit dual
+        (Only used to validate the dual values read from the master, see validate_duals)
+
+        pathsK : Contains the considered paths for each commodity
     """
 #   ------------- DUAL OF THE RESTRICTED MASTER PROBLEM -------------
     
-    model = cplex.Cplex() # Initialize the model
-    model.objective.set_sense(model.objective.sense.maximize) # Set the objective function to maximization
+    model = createLP(lp_backend, 'max') # Initialize the model, maximization
 
     # -- Add variables --
     # Correspond to the flow conservation constraints
-    for i in range(nCommodities):
-        model.variables.add(obj = [1], lb = [-cplex.infinity], ub = [cplex.infinity],#obj contains the coefficients of the decision variables in the objective function
-                            types = [model.variables.type.continuous],
-                            names = ['Y( K_' + str(i) + ')'])
-        
+    model.addColumns([1] * nCommodities, [-np.inf] * nCommodities, [np.inf] * nCommodities, # Coefficients of the decision variables in the objective function, bounds
+                     ['Y( K_' + str(i) + ')' for i in range(nCommodities)])
+
     # Correspond to the node capacity constraints 
-    for i in range(nStations):
-        model.variables.add(obj = [ capacity_node[node[i][2]-1] ], lb = [-cplex.infinity], ub = [0],
-                            types = [model.variables.type.continuous],
-                            names = ['Y( ' + str(node[i][0])  + ')'])
-        
+    model.addColumns([ capacity_node[node[i][2]-1] for i in range(nStations) ], [-np.inf] * nStations, [0] * nStations,
+                     ['Y( ' + str(node[i][0])  + ')' for i in range(nStations)])
+
     # Correspond to the arc capacity constraints 
-    for i in range(nArcs):
-        model.variables.add(obj = [ arc[i][3] ], lb = [-cplex.infinity], ub = [0],
-                            types = [model.variables.type.continuous],
-                            names = ['Y( ' + str(arc[i][0]-1) +','+ str(arc[i][1]-1) + ')'])
+    model.addColumns([ arc[i][3] for i in range(nArcs) ], [-np.inf] * nArcs, [0] * nArcs,
+                     ['Y( ' + str(arc[i][0]-1) +','+ str(arc[i][1]-1) + ')' for i in range(nArcs)])
         
     # -- Add constraints -- 
-    for i in range(nCommodities):
-        for j in range(len(pathsK_nodes[i])):
-            ind = []# Put the indices of the non-zero variables of the current constraint
-            val = []# Put their coefficients here
-            row = []
-            ind.append(i)
-            val.append(1)
-            for k in range(nStations):
-                if(pathsK_nodes[i][j][k] > 0): # Check which node is contained in the current paths (do not include starting node)
-                    ind.append(nCommodities+k)
-                    val.append(commodities[i][2])
-            for l in range(nArcs):
-                if(pathsK[i][j][l] > 0): # Check which arc is contained in the current paths
-                    ind.append(nCommodities+nStations+l)
-                    val.append(commodities[i][2])
-            row.append([ind, val])
-            model.linear_constraints.add(lin_expr = row,
-                                     senses = "L", #Less or equal than constraint
-                                     rhs = [ pathsK_nodes[i][j][nStations]*float(commodities[i][2]) ] ) # Right Hand Side of the constraint
+    # One per path : its coefficients are the column of the path in the restricted master, assembled at once (the path doesn't include its starting node)
+    forCommodity = [i for i in range(nCommodities) for j in range(len(pathsK[i]))]
+    paths = [path for i in range(nCommodities) for path in pathsK[i]]
+    model.addRows("L" * len(paths), [ path.cost*float(commodities[k][2]) for k, path in zip(forCommodity, paths) ], None, # Less or equal than constraints, Right Hand Side
+                  columnMatrix(forCommodity, paths, quantitiesK, nStations, nArcs).T)
+
+    if(phase_one): # Correspond to the artificial variables
+        model.addRows("L" * nCommodities, [ artificial_cost*float(commodities[i][2]) for i in range(nCommodities) ], None,
+                      [([i], [1]) for i in range(nCommodities)])
 
     try:
         print("\n\n----------- RESTRICTED DUAL SOLUTION : -----------\n")
-        model.set_results_stream(None)
-        model.set_warning_stream(None)
         model.solve()
-        model.write('test_dual.lp')
+        if(lp_backend == 'cplex'):
+            model.write('test_dual.lp')
         
-    except CplexSolverError as e:
-        print("Exception raised during dual of restricted problem: " + e)
+    except SolverError as e:
+        print("Exception raised during dual of restricted problem: ", e)
 
     # Return the dual variables corresponding to the commodities, arcs and nodes constraints
-    return model.solution.get_values()[:nCommodities] , model.solution.get_values()[nCommodities:nCommodities+nStations], model.solution.get_values()[nCommodities+nStations:]
+    values = model.getValues().tolist()
+    return values[:nCommodities] , values[nCommodities:nCommodities+nStations], values[nCommodities+nStations:]
 
-def restricted_Master(pathsK_nodes, pathsK):
-    """ Return the solution to the restricted master problem, as well as, the dual variables
+def restricted_Master(pathsK):
+    """ Return the solution to the restricted master problem, as well as, the dual variables (read from the same solve)
+        The model persists between two calls : the paths added since the last call are appended to it as new columns,
+        then it is re-solved starting from the previous basis
 
-        pathsK_nodes : Contains the considered paths(node-based) for each commodity
-        pathsK : Contains the considered paths(arc-based) for each commodity
+        pathsK : Contains the considered paths for each commodity
     """
     
 #   ------------- SOLVE THE RESTRICTED MASTER PROBLEM -------------
-        
-    model = cplex.Cplex() # Initialize the model
-    model.objective.set_sense(model.objective.sense.minimize) ## Set the objective function to minimization
-    
-    # -- Add variables
-    for i in range(nCommodities):
-        for j in range(len(pathsK_nodes[i])):
-            model.variables.add(obj = [pathsK_nodes[i][j][nStations]*float(commodities[i][2])], lb = [0], ub = [1],#obj contains the coefficients of the decision variables in the objective function                               
-                                types = [model.variables.type.continuous],
-                                names = ['P(' + str(i) + ',' + str(j) + ')']) 
 
-    # -- Add constraints -- 
-    #Flow conservation constraints :
-    count = 0 # To iterate over the indices of the decision variables
+    # -- Add the new variables --
+    forCommodity, newPaths, pinned = [], [], []
     for i in range(nCommodities):
-        ind = [] # Put the indices of the non-zero variables of the current constraint
-        val = [] # Put their coefficients here
-        row = []
-        for j in range(len(pathsK_nodes[i])):
-            ind.append(count) 
-            val.append(1)
-            count += 1
-        row.append([ind, val])
-        model.linear_constraints.add(lin_expr = row,
-                                     senses = "E", #Equality constraint
-                                     rhs = [1] ) # Right Hand Side of the constraint
- 
-    #Node capacity constraints :
-    for i in range(nStations): 
-        ind, val, row = [], [], []
-        count = 0
-        for j in range(nCommodities): #For each commodity path, check each time a path contains the node (do not include starting node)
-            for k in range(len(pathsK_nodes[j])):
-                if(pathsK_nodes[j][k][i] > 0): # If it is the case, add the decision variable index to the constraint
-                    ind.append(count)
-                    val.append(commodities[j][2]) # With its coefficiant
-                count += 1
-        row.append([ind, val])
-        model.linear_constraints.add(lin_expr = row,
-                                     senses = "L", # Less-than
-                                     rhs = [ capacity_node[node[i][2]-1] ] ) #Capacity of the node (-1 because type_id start at 1)
-
-    #Arc capacity constraints :
-    for i in range(nArcs): 
-        ind, val, row = [], [], []
-        count = 0
-        for j in range(nCommodities): #For each commodity path, check each time a path contains the node (do not include starting node)
-            for k in range(len(pathsK[j])):
-                if(pathsK[j][k][i] > 0): # If it is the case, add the decision variable index to the constraint
-                    ind.append(count)
-                    val.append(commodities[j][2]) # With its coefficiant
-                count += 1
-        row.append([ind, val])
-        model.linear_constraints.add(lin_expr = row,
-                                     senses = "L", # Less-than
-                                     rhs = [ arc[i][3] ] ) #Capacity of the node (-1 because type_id start at 1)
+        for j in range(master.countPaths(i), len(pathsK[i])): # Paths which are not in the model yet
+            forCommodity.append(i)
+            newPaths.append(pathsK[i][j])
+            pinned.append(pathsK.restored[i][j]) # A path recovered from the archive is never retired again
+    master.addColumns(forCommodity, newPaths, pinned)
         
     try:
         print("\n\n----------- RESTRICTED MASTER SOLUTION : -----------\n")
-        model.set_results_stream(None)
-        model.set_warning_stream(None)
-        model.solve()
-        model.write('test_restricted.lp')
+        obj_Function, solution = master.solve()
+        if(lp_backend == 'cplex'):
+            master.model.write('test_restricted.lp')
         print("\n")
-        print("Solution primal : ",model.solution.get_values())
+        print("Solution primal : ",solution)
         
         #Print the solution
         count = 0
         for i in range(nCommodities):
-            for j in range(len(pathsK_nodes[i])):
+            for j in range(len(pathsK[i])):
                 
-                indices = [k for k, x in enumerate(pathsK_nodes[i][j]) if (x > 0 and k < nStations)] #Get the indices of the nodes contained in the current path
-
-                print("\t", model.solution.get_values(count)*commodities[i][2] ,"units of commodity n°", i+1 ,"on path", node[commodities[i][0]][0],''
-                      + ' '.join([node[k][0] for k in indices]) + ". Length path : " + str(pathsK_nodes[i][j][nStations]) )
+                print("\t", solution[count]*commodities[i][2] ,"units of commodity n°", i+1 ,"on path", node[commodities[i][0]][0],''
+                      + ' '.join([node[k][0] for k in pathsK[i][j].nodes]) + ". Length path : " + str(pathsK[i][j].cost) )
                 count += 1
                 
-        print("\nTotal cost = " + str(model.solution.get_objective_value()))
+        print("\nTotal cost = " + str(obj_Function))
+        if(phase_one):
+            print("Unrouted quantity (artificial variables) = " + str(np.dot(master.unrouted, quantitiesK)))
+        if(lazy_capacity_rows):
+            print("Capacity rows in the master = " + str(len(master.activeRows)) + " out of " + str(nStations + nArcs))
         
-        dualCommodities, dualStations, dualArcs = dual_of_Restrited(pathsK_nodes, pathsK) # Compute the dual variables and print them
+        dualCommodities, dualStations, dualArcs = master.getDuals() # Dual values of the rows of the master, from the same solve
+
+        if(validate_duals): # Solve the explicit dual of the restricted master as well, both objective values must match
+            explicitDuals = dual_of_Restrited(pathsK)
+            print("Dual objective (master duals) = " + str(master.dualObjective(dualCommodities, dualStations, dualArcs))
+                  + " --- Dual objective (explicit dual) = " + str(master.dualObjective(*explicitDuals)))
         
         print()
         for i in range(len(dualCommodities)):
@@ -365,112 +300,370 @@ def restricted_Master(pathsK_nodes, pathsK):
             if(dualArcs[i] != 0):
                 print("Dual values y_Arc" + str(i) + " = "+ str(dualArcs[i]))
             
-    except CplexSolverError as e:
+    except SolverError as e:
         print("Exception raised during restricted master problem: ", e)
 
-    return model.solution.get_objective_value(), model.solution.get_values(), dualCommodities, dualStations, dualArcs
+    return obj_Function, solution, dualCommodities, dualStations, dualArcs
 
 def pricingProblem(dualCommodities, dualStations, dualArcs): 
     """ Return the paths corresponding to the most negative reduced cost of each commodity
 
+        0. Skip the commodities whose reduced cost can't be negative (see screen_pricing)
         1. For each commodity, solve the pricing problem using Dijkstra's algorithm
+           (or an A* search towards its destination, see astar_pricing)
             1.1. If a path with a negative reduced cost is found, add it to the solution set
-        2. Return the solution set, and the corresponding commodities
+        2. Add the next shortest paths of these commodities, if their reduced cost is negative (see paths_per_commodity)
+        3. Return the solution set, and the corresponding commodities
     """
 #   ------------- SOLVE THE PRICING PROBLEM-------------
 
     reducedCost = 0 # Contains a negative value if we found a path with negative reduced cost
     
     forCommodity = [] # id of the commodity which will receive the new paths, if any
-    bestPath_nodes = [] # Contains the paths which will be added (node_id's and cost)
-    bestPath_arcs = [] # Contains the paths which will be added (arc_id's)
-
-    shortest_from_node = np.full((nStations, nStations), np.inf) # Total cost of the shortest path from index
-    previous_nodes = np.full((nStations, nStations), -1, dtype=int) # Nodes id to go backward
-    previous_arcs = np.full((nStations, nStations), -1, dtype=int) # Arc id to go backward
-
-    # -- Compute the new cost vector -- 
-    cost_for_commo = getCosts(nStations)
-    for i in range(nStations):
-        for j in np.nonzero(cost_for_commo[i,:,0])[0]:
-                cost_for_commo[i,j,0] = cost_for_commo[i,j,0] - dualStations[j]
-                
-    for i in np.nonzero(dualArcs)[0]:
-        if(cost_for_commo[ arc[i][0]-1, arc[i][1]-1, 0 ] > 0): 
-            cost_for_commo[ arc[i][0]-1, arc[i][1]-1, 0 ] = cost_for_commo[ arc[i][0]-1, arc[i][1]-1, 0 ] - dualArcs[i]
+    bestPaths = [] # Contains the paths which will be added
+
+    shortest_from_node = {} # Total cost of the shortest path from each origin
+    previous_nodes = {} # Nodes id to go backward
+    previous_arcs = {} # Arc id to go backward
+
+    # -- Compute the new cost vector (one entry per arc, in the order of the CSR adjacency) -- 
+    cost_for_commo = reducedCosts(graph, dualStations, dualArcs)
+
+    # -- Screen the commodities --
+    priced = np.ones(nCommodities, dtype=bool) # Commodities whose pricing problem is solved
+    if(screen_pricing): # A reduced arc cost is never below the arc cost : the reduced cost of a commodity is at least (length of its shortest path in the original network)*quantity - dual
+        priced = (lengthK * quantitiesK) - np.asarray(dualCommodities) < 0
+        print("\n\tSCREENING : ", nCommodities - np.count_nonzero(priced), "commodities skipped (lower bound on their reduced cost >= 0) --- ", np.count_nonzero(priced), "priced")
+
+    if(batched_pricing): # Solve one shortest path tree per distinct origin instead
+        return alternativePaths(dualCommodities, cost_for_commo, *pricingByOrigin(dualCommodities, cost_for_commo, priced))
             
     # -- Run Dijkstra's -- 
-    for i in range(nCommodities): #Solve the shortest path problem (with updated cost) for each commodity
+    for i in np.nonzero(priced)[0].tolist(): #Solve the shortest path problem (with updated cost) for each commodity
         
         origin = commodities[i][0]
         dest = commodities[i][1]
         
-        if( np.array_equal(previous_nodes[origin], np.full((nStations), -1, dtype=int)) ): # Haven't run Dijkstra yet for this origin
-            shortest_from_node[origin], previous_nodes[origin], previous_arcs[origin] = dijkstra(origin, cost_for_commo, set(), set())
+        if(astar_pricing): # Point-to-point search, guided by the distances to dest in the original network
+            labels, precedents_node, precedents_arc = aStar(origin, dest, graph, cost_for_commo, distanceTo[dest])
+
+        else:
+            if(origin not in previous_nodes): # Haven't run Dijkstra yet for this origin
+                shortest_from_node[origin], previous_nodes[origin], previous_arcs[origin] = dijkstra(origin, cost_for_commo, None, None)
+
+            labels, precedents_node, precedents_arc = shortest_from_node[origin], previous_nodes[origin], previous_arcs[origin]
                           
-        currentReducedCost = (shortest_from_node[origin, dest] * commodities[i][2]) - dualCommodities[i] #Compute the reducedCost
+        currentReducedCost = (labels[dest] * commodities[i][2]) - dualCommodities[i] #Compute the reducedCost
         
         if(currentReducedCost < 0):
             
             # -- Construct the new path --
-            newPath_nodes = [0] * (nStations+1)
-            newPath_arcs = [0] * nArcs
+            newPath_nodes = []
+            newPath_arcs = []
+            newPath_cost = 0
             
             # By going backward from destination
             while(dest != origin):
-                newPath_nodes[dest] = 1 * commodities[i][2]
-                newPath_nodes[nStations] += arc[previous_arcs[origin, dest]][2] # Compute the cost on the fly
-                
-                newPath_arcs[previous_arcs[origin, dest]] = 1 * commodities[i][2]
+                newPath_nodes.append(dest)
+                newPath_arcs.append(precedents_arc[dest])
+                newPath_cost += arc[precedents_arc[dest]][2] # Compute the cost on the fly
 
-                dest = previous_nodes[origin, dest]
+                dest = precedents_node[dest]
 
             reducedCost = round(currentReducedCost) # Round to avoid computational mistake (10^-23 instead of 0)
             forCommodity.append(i) 
-            bestPath_nodes.append(newPath_nodes)
-            bestPath_arcs.append(newPath_arcs)
+            bestPaths.append(Path(newPath_nodes[::-1], newPath_arcs[::-1], newPath_cost))
         
         print("\n\n----------- PRICING PROBLEM SOLUTION FOR COMMODITY n°", i+1 ,": -----------\n")
         #Print reduced cost for the current commodity
         print()
         print("\n\tREDUCED COST : ", currentReducedCost)
         
-    return reducedCost, bestPath_nodes, forCommodity, bestPath_arcs
+    return alternativePaths(dualCommodities, cost_for_commo, reducedCost, bestPaths, forCommodity)
+
+def alternativePaths(dualCommodities, cost_for_commo, reducedCost, bestPaths, forCommodity):
+    """ Return the solution of the pricing problem (reducedCost, bestPaths, forCommodity), with up to paths_per_commodity paths for each commodity of forCommodity
+        The next paths of a commodity are its following shortest paths under the reduced costs (Yen's algorithm, starting from the path found),
+        they are added if their reduced cost is negative as well
+
+        dualCommodities : Dual values of the flow conservation constraints
+        cost_for_commo : Reduced cost of each arc, in the order of the CSR adjacency
+        reducedCost, bestPaths, forCommodity : Solution of the pricing problem, one path per commodity
+    """
+    if(paths_per_commodity <= 1):
+        return reducedCost, bestPaths, forCommodity
+
+    paths, commodity = list(bestPaths), list(forCommodity)
+    for path, k in zip(bestPaths, forCommodity):
+        first = (np.sum(cost_for_commo[arcPosition[path.arcs]]), path.nodes.tolist(), path.arcs.tolist()) # Reduced cost of the path found, per unit
+        for pathCost, nodes, arcs in kShortestPaths(commodities[k][0], commodities[k][1], graph, cost_for_commo, paths_per_commodity, first)[1:]:
+            if(pathCost * commodities[k][2] - dualCommodities[k] < 0):
+                paths.append(Path(nodes, arcs, np.sum(arcLength[arcs])))
+                commodity.append(k)
+
+    print("\tALTERNATIVE PATHS : ", len(paths) - len(bestPaths))
+
+    return reducedCost, paths, commodity
+
+def pathReducedCosts(paths, forCommodity, dualCommodities, dualStations, dualArcs):
+    """ Return the reduced cost of each path for the given dual values
+
+        paths : Paths
+        forCommodity : Commodity of each path
+    """
+    dualStations, dualArcs = np.asarray(dualStations), np.asarray(dualArcs)
+
+    return np.array([(np.sum(arcLength[path.arcs] - dualStations[path.nodes] - dualArcs[path.arcs]) * quantitiesK[k]) - dualCommodities[k]
+                     for path, k in zip(paths, forCommodity)])
+
+def pricingByOrigin(dualCommodities, cost_for_commo, priced):
+    """ Return the paths corresponding to the most negative reduced cost of each commodity
+
+        1. For each distinct origin, solve the pricing problem of all the commodities leaving it with one run of Dijkstra's algorithm
+           (the search stops once their destinations are settled, and the tree of the last round is reused
+           if none of the arcs it scanned changed its reduced cost, see incremental_pricing)
+           With partial_pricing, the origins are taken by blocks, starting where the last round stopped,
+           until enough paths are found or the time budget is spent (all the origins are scanned if no path is found)
+        2. Compute the reduced cost of every commodity at once from the shortest path trees
+        3. Read all the paths with a negative reduced cost backward, in a single pass over the predecessor arrays
+
+        dualCommodities : Dual values of the flow conservation constraints
+        cost_for_commo : Reduced cost of each arc, in the order of the CSR adjacency
+        priced : Commodities whose pricing problem is solved (an origin without any of them is skipped)
+    """
+#   ------------- SOLVE THE PRICING PROBLEM, ONE TREE PER ORIGIN -------------
+
+    # -- Trees of the last round which are still valid --
+    if(incremental_pricing):
+        changedNodes = np.zeros(nStations, dtype=bool) # Nodes with a leaving arc whose reduced cost changed since the last round
+        changedNodes[arcTail[cost_for_commo != previousCosts]] = True
+        treeValid[np.isfinite(shortest_from_node[:, changedNodes]).any(axis = 1)] = False # (A tree only labels the nodes it settled, it scanned their leaving arcs)
+    else:
+        treeValid[:] = False
+    previousCosts[:] = cost_for_commo
+
+    trees = np.unique(treeK[priced]) # Origins to solve (index in originsK)
+    first = np.searchsorted(trees, pricingCursor[0])
+    trees = np.concatenate((trees[first:], trees[:first])) # Round robin : start with the origin following the last one priced
+
+    blocks = [trees]
+    if(partial_pricing):
+        blocks = np.array_split(trees, max(1, int(np.ceil(len(trees) / float(partial_block)))))
+
+    start = time.time()
+    scanned = np.zeros(len(originsK), dtype=bool) # Origins priced in this round
+    reused = 0 # Number of trees of the last round reused
+    for block in blocks:
+        solved = block[~treeValid[block]] # Origins whose tree has to be recomputed
+        reused += len(block) - len(solved)
+
+        # -- Run Dijkstra's once per distinct origin --
+        if(treePool is not None): # In parallel, the reduced costs are shared with the workers
+            labels, precedents_node, precedents_arc = treePool.solve(cost_for_commo, solved)
+            shortest_from_node[solved], previous_nodes[solved], previous_arcs[solved] = labels[solved], precedents_node[solved], precedents_arc[solved]
+
+        else:
+            for j in solved.tolist():
+                shortest_from_node[j], previous_nodes[j], previous_arcs[j] = dijkstra(originsK[j], cost_for_commo, None, None, destinationsK[commoditiesByOrigin[j]])
+
+        treeValid[solved] = True
+        scanned[block] = True
+
+        # -- Compute the reduced cost of the commodities priced so far --
+        inWindow = priced & scanned[treeK]
+        currentReducedCost = np.where(inWindow, (shortest_from_node[treeK, destinationsK] * quantitiesK) - np.asarray(dualCommodities), 0) # (The rows of the other origins aren't computed)
+        forCommodity = np.nonzero(currentReducedCost < 0)[0]
+
+        if(len(forCommodity) > 0 and (len(forCommodity) >= partial_columns or time.time() - start > partial_time)): # Enough paths for this round
+            break
+
+    if(len(trees) > 0):
+        pricingCursor[0] = (block[-1] + 1) % len(originsK) # The next round starts after the last origin priced
+    pricingComplete[0] = scanned[trees].all() # A partial round leaves some commodities unpriced
+
+    print("\n\n----------- PRICING PROBLEM SOLUTION : -----------\n")
+    print("\tDISTINCT ORIGINS : ", np.count_nonzero(scanned), "out of", len(originsK), "(", reused, "trees reused ) --- NEGATIVE REDUCED COSTS : ", len(forCommodity))
+
+    if(len(forCommodity) == 0):
+        return 0, [], []
+
+    # -- Construct the new paths --
+    pathNodes, pathArcs = extractPaths(treeK[forCommodity], destinationsK[forCommodity], previous_nodes, previous_arcs)
+    pathLengths = np.sum(np.where(pathArcs >= 0, arcLength[pathArcs], 0), axis = 1) # Cost of each path in the original network
+
+    bestPaths = [] # Contains the paths which will be added
+    for j in range(len(forCommodity)):
+        steps = pathArcs[j] >= 0 # (The paths were read backward from the destination)
+        bestPaths.append(Path(pathNodes[j][steps][::-1], pathArcs[j][steps][::-1], pathLengths[j]))
+
+    reducedCost = round(np.min(currentReducedCost)) # Round to avoid computational mistake (10^-23 instead of 0)
+
+    return reducedCost, bestPaths, forCommodity.tolist()
                    
 # ------------- DATA ------------- 
 
 s_time_loading_data = time.time() # Time - 0 Start loading data
 
-nStations, node = getNodes() # Get the nodes
-nArcs, arc = getArcs() # Get the arcs
-nCommodities, commodities = getCommodities() # Get the commodities
-cost = getCosts(nStations) # Get the cost adjency matrix
+instance_directory = None # Directory of the binary instance to solve (written by instance.py from medium_data.py), None : read the python data module
+
+if(instance_directory is not None): # Memory-mapped columns, no python module to execute
+    instance = loadInstance(instance_directory)
+    nStations, node, nArcs, arc, nCommodities, commodities = getLists(instance) # Get the nodes, arcs and commodities
+    graph = Graph(*getInstanceGraph(instance)) # Get the CSR adjacency of the network
+
+else:
+    nStations, node = getNodes() # Get the nodes
+    nArcs, arc = getArcs() # Get the arcs
+    nCommodities, commodities = getCommodities() # Get the commodities
+    graph = Graph(*getGraph(nStations)) # Get the CSR adjacency of the network
+
+arcPosition = getPositions(graph) # Position of each arc_id in the CSR adjacency
+cost = graph.costs.astype(float) # Cost of each arc, in the order of the CSR adjacency
+arcLength = np.array([row[2] for row in arc]) # Cost of each arc, by arc_id
+
+# -- Group the commodities by origin, once --
+originsK, commoditiesByOrigin = groupByOrigin([row[0] for row in commodities]) # Distinct origins and the commodities leaving each of them
+treeK = np.zeros(nCommodities, dtype=int) # Index in originsK of the origin of each commodity
+for j in range(len(originsK)):
+    treeK[commoditiesByOrigin[j]] = j
+destinationsK = np.array([row[1] for row in commodities]) # Ending node of each commodity
+quantitiesK = np.array([row[2] for row in commodities]) # Quantity of each commodity
 
 scale_capacity = 1/75 # Variable used to scale up or down the capacity of the arcs
 arc = [[row[0], row[1], row[2], row[3]*scale_capacity] for row in arc] # Update arc capacities
 
+lp_backend = 'cplex' # Solver of the linear programs : 'cplex', or 'highs' (HiGHS through scipy, no licence needed, no warm start)
+lazy_capacity_rows = False # Restricted master : only the capacity rows the paths could violate, the others are added once a solution violates them
+
+phase_one = False # Start from the shortest path of each commodity, an artificial variable per commodity keeps the master feasible (False : greedy feasible initial set of getInitSet())
+artificial_cost = sum(row[2] for row in arc) # Big-M : cost of a unit of commodity on its artificial variable (longer than any path)
+
+batched_pricing = True # Solve the pricing problem with one shortest path tree per distinct origin (False : commodity by commodity)
+screen_pricing = True # Skip the commodities whose reduced cost is bounded below by 0, using their shortest path length in the original network
+partial_pricing = False # Batched pricing : stop a round once partial_columns paths are found or partial_time seconds are spent, the next round resumes from the next origins
+partial_block = 16 # Number of origins priced between two checks of the stopping rule
+partial_columns = 200 # Number of paths which ends a partial pricing round
+partial_time = 1.0 # Time budget (seconds) of a partial pricing round (it goes on until a path is found)
+incremental_pricing = True # Batched pricing : reuse the tree of an origin while the reduced costs of the arcs it scanned don't change
+paths_per_commodity = 1 # Largest number of paths (with a negative reduced cost) added for a commodity in one round, the k shortest paths under the reduced costs
+astar_pricing = False # Commodity by commodity (batched_pricing = False) : A* search from the origin to the destination instead of a whole shortest path tree
+validate_duals = False # Also solve the explicit dual of each restricted master problem, to check the dual values
+
+stabilization_alpha = 0.0 # Wentges smoothing : the pricing problem is solved at alpha*(stability center : priced duals with the best Lagrangian bound) + (1-alpha)*(duals of the master), falls back to the duals of the master when it gives no improving path (0 : no smoothing)
+
+gap_tolerance = 0.0 # Stop once the relative gap between the restricted master and the best Lagrangian bound is below it, e.g. 0.005 (0 : solve to optimality)
+
+column_max_age = 0 # Retire the paths left unused (at 0 with a positive reduced cost) during this many consecutive iterations (0 : never)
+column_pool_size = 0 # Largest number of paths kept in the restricted master, the oldest unused paths are retired first (0 : no limit)
+
+pricing_workers = 0 # Number of processes solving the shortest path trees of the batched pricing in parallel (0 : sequential)
+
 capacity_node = [1000, 45, 45, 80] # Define a capacity value for each type of node
 
+lengthK = np.zeros(nCommodities) # Length of the shortest path of each commodity in the original network
+if(screen_pricing):
+    for j in range(len(originsK)):
+        lengthK[commoditiesByOrigin[j]] = shortestPaths(originsK[j], graph, cost)[0][destinationsK[commoditiesByOrigin[j]]]
+
+# The duals of the capacity constraints are <= 0, so the reduced cost of an arc is never below its cost :
+# the distance to the destination in the original network is a consistent A* potential
+distanceTo = {} # Distance from each node to each destination, in the original network
+if(astar_pricing and not batched_pricing):
+    reverse = reverseGraph(graph) # Reversed network : one tree of the reversed network gives the distances to its root
+    for destination in np.unique(destinationsK).tolist():
+        distanceTo[destination] = shortestPaths(destination, reverse, reverse.costs)[0]
+
+# -- Shortest path tree of each distinct origin, kept from one pricing round to the next (batched pricing) --
+shortest_from_node = np.full((len(originsK), nStations), np.inf) # Total cost of the shortest path from each distinct origin
+previous_nodes = np.full((len(originsK), nStations), -1, dtype=int) # Nodes id to go backward
+previous_arcs = np.full((len(originsK), nStations), -1, dtype=int) # Arc id to go backward
+treeValid = np.zeros(len(originsK), dtype=bool) # Trees computed with the current reduced costs
+previousCosts = np.full(nArcs, np.nan) # Reduced cost of each arc in the last round (in the order of the CSR adjacency)
+pricingCursor = np.zeros(1, dtype=int) # Index in originsK of the origin which starts the next pricing round
+pricingComplete = np.ones(1, dtype=bool) # The last pricing round solved the pricing problem of every commodity (needed by the Lagrangian bound)
+arcTail = np.repeat(np.arange(nStations), np.diff(graph.offsets)) # Starting node of each arc, in the order of the CSR adjacency
+
+treePool = None
+if(batched_pricing and pricing_workers > 0):
+    treePool = TreePool(graph, originsK, pricing_workers, [destinationsK[commodities] for commodities in commoditiesByOrigin]) # Start the workers, the graph (and the destinations of each origin) is put in shared memory once
+
 t_time_loading_data = time.time() # Time - 1 Start searching for feasible solution
 
 # ------------- ALGORITHM -------------
 
-#pathsK_nodes[k,i,j] with k = commodity_id // i = path_id of commodity k // j = node_id of the path 
-pathsK_nodes = [[] for i in range(nCommodities)] # Contains all initial paths for each commodity (by nodes)
-
-#pathsK[k,i,j] with k = commodity_id // i = path_id of commodity k // j = arc_id of the path 
-pathsK = [[] for i in range(nCommodities)] # Contains all initial paths for each commodity (by arcs)
+#pathsK[k][i] with k = commodity_id // i = path_id of commodity k : nodes, arcs and cost of the path
+if(phase_one):
+    pathsK = getShortestPathSet() # Shortest path of each commodity, the artificial variables absorb the capacity violations
+else:
+    pathsK = getInitSet() # Get the initial set of variable through Dijkstra and "route through best possible shortest path" method
 
-pathsK_nodes, pathsK = getInitSet() # Get the initial set of variable through Dijkstra and "route through best possible shortest path" method
+master = RestrictedMaster(quantitiesK, [capacity_node[row[2]-1] for row in node], [row[3] for row in arc],
+                          artificial_cost if phase_one else 0, lp_backend, lazy_capacity_rows) # Restricted master problem, kept across the iterations
 
 t_time_init_set = time.time() # Time - 2 Start optimizing the problem
 
+iteration = 0 # Number of column generation iterations
+
+smoothing = DualSmoothing(stabilization_alpha) if stabilization_alpha > 0 else None # Stabilization of the duals given to the pricing problem
+
+bestBound = -np.inf # Best Lagrangian lower bound on the optimal value of the master problem
+purging = column_max_age > 0 or column_pool_size > 0 # Retire the unused paths, until a round only brings retired paths back
+bounds = [] # Trajectory of the bounds : iteration, restricted master objective, Lagrangian bound (None if not available), best bound
+
 while True:
     
-    obj_Function, solution, dualCommodities, dualStations, dualArcs = restricted_Master(pathsK_nodes, pathsK) #Solve the restricted master problem
-    reducedCost, newPath, forCommodity, newPath_arc = pricingProblem(dualCommodities, dualStations, dualArcs) #Solve the pricing problem
-    
-    if(round(reducedCost) == 0): # round to avoid minor computational error (10^-23 for 0)
+    iteration += 1
+    obj_Function, solution, dualCommodities, dualStations, dualArcs = restricted_Master(pathsK) #Solve the restricted master problem
+    pricedDuals = (dualCommodities, dualStations, dualArcs) # Dual values given to the pricing problem
+    if(smoothing is not None): # Solve the pricing problem at the separation point (stabilized duals)
+        pricedDuals = smoothing.point(pricedDuals)
+        reducedCost, newPath, forCommodity = pricingProblem(*pricedDuals)
+
+        if(not np.any(pathReducedCosts(newPath, forCommodity, dualCommodities, dualStations, dualArcs) < 0)): # Mispricing : no path improves the restricted master
+            smoothing.mispriced()
+            pricedDuals = (dualCommodities, dualStations, dualArcs)
+            reducedCost, newPath, forCommodity = pricingProblem(*pricedDuals) # Fall back to the duals of the master (no path then proves optimality)
+
+    else:
+        reducedCost, newPath, forCommodity = pricingProblem(*pricedDuals) #Solve the pricing problem
+
+    # -- Lagrangian bound : dual objective + minimum reduced cost of each commodity (0 if none is negative), at the priced duals --
+    # (Valid for any duals of the right sign, as long as every commodity was priced : a screened commodity has no negative reduced cost)
+    bound = None
+    if(pricingComplete[0]):
+        minReducedCost = np.zeros(nCommodities)
+        np.minimum.at(minReducedCost, np.asarray(forCommodity, dtype=int), pathReducedCosts(newPath, forCommodity, *pricedDuals))
+        bound = master.dualObjective(*pricedDuals) + np.sum(minReducedCost)
+        bestBound = max(bestBound, bound)
+
+    if(smoothing is not None):
+        smoothing.update(pricedDuals, bound) # The stability center moves only when the bound improves
+
+    gap = (obj_Function - bestBound) / max(abs(obj_Function), 1e-9) # Relative gap between the restricted master and the best bound
+    bounds.append((iteration, obj_Function, bound, bestBound))
+    print("\nBOUNDS : master", obj_Function, "--- Lagrangian", bound, "--- best", bestBound, "--- gap", gap)
+
+    added = 0 # Number of new paths actually added to the pool
+    recovered = 0 # Number of retired paths taken back from the archive (not new : they don't keep the loop going)
+    if(gap_tolerance > 0 and gap <= gap_tolerance): # The restricted master is close enough to the optimum, don't add the paths
+        print("\nGAP BELOW TOLERANCE : ", gap, "<=", gap_tolerance)
+
+    elif(round(reducedCost) != 0): # Add the new paths to the restricted set (duplicates are rejected)
+        recoveredBefore = pathsK.recovered
+        for j in range(len(newPath)):
+            added += pathsK.add(forCommodity[j], newPath[j], iteration)
+        recovered = pathsK.recovered - recoveredBefore
+        added -= recovered
+
+        stats = pathsK.stats()
+        print("\nCOLUMN POOL : ", stats['paths'], "paths --- ", added, "added and", recovered, "recovered at iteration", iteration, "--- ",
+              stats['duplicates'], "duplicates rejected --- at most", stats['max_per_commodity'], "paths for a commodity")
+
+    if(added == 0 and recovered > 0 and purging): # Only retired paths came back : stop retiring paths, the next rounds end the column generation
+        print("\nCOLUMN MANAGEMENT STOPPED : ", recovered, "retired paths recovered and no new path at iteration", iteration)
+        purging = False
+
+    elif(added == 0): # No path with a negative reduced cost (round to avoid minor computational error, 10^-23 for 0), or only duplicates
         
         t_time_solving = time.time() # Time - 3 Algorithm terminates
         
@@ -478,24 +671,35 @@ while True:
         count = 0
         for i in range(nCommodities):
             print()
-            for j in range(len(pathsK_nodes[i])):
+            for j in range(len(pathsK[i])):
                 
-                indices = [k for k, x in enumerate(pathsK_nodes[i][j]) if (x > 0 and k < nStations) ] #Get the indices of the arcs contained in the current path
-
                 print("\t", solution[count]*commodities[i][2] ,"units of commodity n°", i+1 ,"on path", node[commodities[i][0]][0],''
-                      + ' '.join([node[k][0] for k in indices]) + ". Length path : " + str(pathsK_nodes[i][j][nStations]) )
+                      + ' '.join([node[k][0] for k in pathsK[i][j].nodes]) + ". Length path : " + str(pathsK[i][j].cost) )
                 count += 1
                 
         print("\nTotal cost = " + str(obj_Function))
+        if(phase_one and np.dot(master.unrouted, quantitiesK) > 1e-6): # Some commodities can't be routed within the capacities
+            print("INFEASIBLE : ", np.dot(master.unrouted, quantitiesK), "units left on the artificial variables (or artificial_cost is too small)")
         print("\nLoading data duration : ", t_time_loading_data - s_time_loading_data)
         print("Finding initial set duration : ", t_time_init_set - t_time_loading_data)
         print("Solving problem duration : ", t_time_solving - t_time_init_set)
         print("\nTotal duration : ", t_time_solving - s_time_loading_data)
+        print("Iterations : ", iteration, ("--- Mispricings : " + str(smoothing.mispricings)) if smoothing is not None else "")
+        print("\nBound trajectory (iteration, master, Lagrangian bound, best bound) : ")
+        for row in bounds:
+            print("\t", *row)
+
+        if(treePool is not None):
+            treePool.close() # Stop the workers and release the shared memory
         break
-    
-    else: # Add the new paths to the restricted set
-        
-        for j in range(len(newPath)):
-            pathsK_nodes[forCommodity[j]].append(newPath[j])
-            pathsK[forCommodity[j]].append(newPath_arc[j])
+
+    # -- Retire the paths unused for a long time (kept in the archive of pathsK, recovered if the pricing finds them again) --
+    if(purging):
+        retired = master.purge(column_max_age, column_pool_size)
+        for k, positions in retired.items():
+            pathsK.retire(k, positions)
+
+        if(len(retired) > 0):
+            print("\nRETIRED : ", sum(len(positions) for positions in retired.values()), "paths --- ", master.nColumns, "paths left in the master --- ",
+                  pathsK.retired, "retired and", pathsK.recovered, "recovered so far")
             
@@ -0,0 +1,150 @@
+                    # ------------- TOOLS TO SOLVE THE PRICING PROBLEM -------------
+
+import atexit
+from concurrent.futures import ProcessPoolExecutor
+import multiprocessing
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from shortest_path import Graph, shortestPaths
+
+
+def reducedCosts(graph, dualStations, dualArcs):
+    """ Return the reduced cost of each arc, in the order of the CSR adjacency : cost - dual of its ending node - dual of the arc
+        Computed in float (the dual values are fractional)
+
+        graph : Compressed-sparse-row adjacency of the network
+        dualStations : Dual value of each node capacity constraint
+        dualArcs : Dual value of each arc capacity constraint (by arc_id)
+    """
+    return graph.costs.astype(np.float64) - np.asarray(dualStations, dtype=np.float64)[graph.heads] - np.asarray(dualArcs, dtype=np.float64)[graph.arcIds]
+
+def groupByOrigin(origins):
+    """ Return the distinct origins, and for each of them the indices of the commodities leaving it
+
+        origins : Starting node of each commodity
+    """
+    origins = np.asarray(origins)
+    order = np.argsort(origins, kind='stable') # Commodities sorted by origin (keep the commodity order inside a group)
+    distinct, starts = np.unique(origins[order], return_index=True)
+
+    return distinct, np.split(order, starts[1:])
+
+def extractPaths(rows, destinations, precedent_nodes, precedent_arcs):
+    """ Return the nodes and the arcs of the shortest paths leading to each destination
+        All the paths are followed backward at the same time, one step per iteration :
+        entry [j, s] is the node/arc met at step s from destination j (-1 once the origin of path j is reached).
+        The origin itself is not part of the returned nodes.
+
+        rows : Row of the predecessor arrays to follow for each path (i.e. the tree of its origin)
+        destinations : Ending node of each path
+        precedent_nodes : Previous node of each node, one row per shortest path tree
+        precedent_arcs : Previous arc of each node, one row per shortest path tree
+    """
+    rows = np.asarray(rows)
+    current = np.array(destinations)
+
+    nodes, arcs = [], []
+    active = precedent_arcs[rows, current] >= 0 # Paths whose origin hasn't been reached yet
+    while active.any():
+        nodes.append(np.where(active, current, -1))
+        arcs.append(np.where(active, precedent_arcs[rows, current], -1))
+
+        current = np.where(active, precedent_nodes[rows, current], current) # Go backward
+        active = precedent_arcs[rows, current] >= 0
+
+    if(len(nodes) == 0):
+        return np.full((len(current), 0), -1, dtype=int), np.full((len(current), 0), -1, dtype=int)
+
+    return np.array(nodes).T, np.array(arcs).T
+
+
+class TreePool(object):
+    """ Process pool computing the shortest path trees of a fixed set of origins in parallel
+        The graph, the arc costs and the resulting trees live in shared memory : nothing but
+        the indices of the origins to process is sent to the workers.
+    """
+
+    def __init__(self, graph, origins, workers, targets = None):
+        """ graph : Compressed-sparse-row adjacency of the network
+            origins : Origins of the shortest path trees
+            workers : Number of processes
+            targets : Nodes of each origin whose shortest paths are needed, the search stops once they are settled (None : whole trees)
+        """
+        nStations = len(graph.offsets) - 1
+        self.workers = workers
+
+        self._memory = [] # Shared memory blocks, released by close()
+        self._arrays = {}
+        self._share('offsets', graph.offsets)
+        self._share('heads', graph.heads)
+        self._share('arcIds', graph.arcIds)
+        self._share('origins', np.asarray(origins, dtype=int))
+        if(targets is not None): # Targets of origin j : targets[targetOffsets[j]:targetOffsets[j+1]]
+            self._share('targetOffsets', np.concatenate(([0], np.cumsum([len(nodes) for nodes in targets]))).astype(int))
+            self._share('targets', np.concatenate([np.asarray(nodes, dtype=int) for nodes in targets] + [np.zeros(0, dtype=int)]))
+        self._share('costs', np.zeros(len(graph.heads))) # Arc costs of the current pricing problem
+        self._share('labels', np.zeros((len(origins), nStations))) # One row per origin
+        self._share('precedent_nodes', np.zeros((len(origins), nStations), dtype=int))
+        self._share('precedent_arcs', np.zeros((len(origins), nStations), dtype=int))
+
+        descriptors = dict((name, (block.name, array.shape, array.dtype.str)) for (name, array), block in zip(self._arrays.items(), self._memory))
+        # The solver scripts run at import, so the workers are forked (a spawned worker would re-run the whole script)
+        self.executor = ProcessPoolExecutor(max_workers = workers, mp_context = multiprocessing.get_context('fork'),
+                                            initializer = _attachArrays, initargs = (descriptors,))
+        atexit.register(self.close) # The shared memory outlives the process : release it even if the script stops on an error
+
+    def _share(self, name, array):
+        """ Copy array to a new shared memory block """
+        block = shared_memory.SharedMemory(create = True, size = max(array.nbytes, 1))
+        self._arrays[name] = np.ndarray(array.shape, dtype = array.dtype, buffer = block.buf)
+        self._arrays[name][...] = array
+        self._memory.append(block)
+
+    def solve(self, costs, rows = None):
+        """ Return the shortest path trees (labels, precedent_nodes, precedent_arcs) of all origins, one row per origin
+
+            costs : Cost of each arc, in the order of the CSR adjacency
+            rows : Indices of the origins to solve, the other rows are left as they are (None : all the origins)
+        """
+        self._arrays['costs'][:] = costs # Visible to every worker
+
+        if(rows is None):
+            rows = np.arange(len(self._arrays['origins']))
+
+        chunks = np.array_split(np.asarray(rows), 4 * self.workers) # Several chunks per worker to balance the load
+        list(self.executor.map(_solveTrees, [chunk for chunk in chunks if len(chunk) > 0]))
+
+        return np.copy(self._arrays['labels']), np.copy(self._arrays['precedent_nodes']), np.copy(self._arrays['precedent_arcs'])
+
+    def close(self):
+        """ Stop the workers and release the shared memory (done at exit if not called) """
+        atexit.unregister(self.close)
+        self.executor.shutdown()
+        self._arrays = {}
+        for block in self._memory:
+            block.close()
+            block.unlink()
+        self._memory = []
+
+# -- Worker side --
+_shared = {} # Arrays of the TreePool, attached once per worker process
+_blocks = [] # Keep the blocks open as long as the worker lives
+
+def _attachArrays(descriptors):
+    """ Attach the worker to the shared memory blocks of the TreePool """
+    for name, (blockName, shape, dtype) in descriptors.items():
+        block = shared_memory.SharedMemory(name = blockName)
+        _blocks.append(block)
+        _shared[name] = np.ndarray(shape, dtype = dtype, buffer = block.buf)
+
+def _solveTrees(indices):
+    """ Compute the shortest path trees of the given origins (indices in the origins of the TreePool) """
+    graph = Graph(_shared['offsets'], _shared['heads'], None, _shared['arcIds'])
+    for j in indices:
+        targets = None
+        if('targets' in _shared):
+            targets = _shared['targets'][_shared['targetOffsets'][j]:_shared['targetOffsets'][j+1]]
+        _shared['labels'][j], _shared['precedent_nodes'][j], _shared['precedent_arcs'][j] = shortestPaths(_shared['origins'][j], graph, _shared['costs'],
+                                                                                                           None, None, targets)
@@ -0,0 +1,360 @@
+                    # ------------- SHORTEST PATH ENGINE (BINARY HEAP OVER A CSR ADJACENCY) -------------
+
+import heapq
+from collections import namedtuple
+
+import numpy as np
+
+# Compressed-sparse-row adjacency returned by getGraph() : the arcs leaving node i are stored at positions offsets[i] to offsets[i+1]-1
+# heads : ending node of each stored arc // costs : its cost // arcIds : its arc_id
+Graph = namedtuple('Graph', ['offsets', 'heads', 'costs', 'arcIds'])
+
+
+def getPositions(graph):
+    """ Return the position of each arc_id in the CSR adjacency (inverse of graph.arcIds) """
+    positions = np.empty(len(graph.arcIds), dtype=int)
+    positions[graph.arcIds] = np.arange(len(graph.arcIds))
+    return positions
+
+def shortestPaths(origin, graph, costs, blockedNodes = None, blockedArcs = None, targets = None):
+    """ Return the shortest paths from origin : labels, precedent_nodes, precedent_arcs
+        Dijkstra's algorithm, the next node to settle is popped from a binary heap (lazy deletion of outdated entries)
+
+        origin : Station from which the method computes the shortest paths
+        graph : Compressed-sparse-row adjacency of the network
+        costs : Cost of each stored arc (same order as graph.heads), arcs with an infinite cost are ignored
+        blockedNodes : Boolean mask by node_id, the arcs entering a blocked node are ignored (None : no blocked node)
+        blockedArcs : Boolean mask by arc_id, blocked arcs are ignored (None : no blocked arc)
+        targets : Stop once all these nodes are settled, only the settled nodes are then labelled (None : settle every node)
+        (costs and the masks are only read)
+    """
+    nStations = len(graph.offsets) - 1
+
+    # Python lists are much faster than numpy arrays for element-wise access
+    offsets = graph.offsets.tolist()
+    heads = graph.heads.tolist()
+    arcIds = graph.arcIds.tolist()
+    costs = np.asarray(costs, dtype=float)
+
+    blocked = np.zeros(len(heads), dtype=bool) # Blocked stored arcs
+    if(blockedNodes is not None):
+        blocked |= np.asarray(blockedNodes, dtype=bool)[graph.heads]
+    if(blockedArcs is not None):
+        blocked |= np.asarray(blockedArcs, dtype=bool)[graph.arcIds]
+    costs = np.where(blocked, np.inf, costs).tolist() # Blocked arcs are ignored like arcs with an infinite cost
+
+    labels = [np.inf] * nStations # Contains the cost of the shortest paths from origin with initial value = infinite
+    labels[origin] = 0
+    precedent_nodes = [-1] * nStations # Contains the previous node of each node in the shortest paths
+    precedent_arcs = [-1] * nStations # Contains the previous arc of each node in the shortest paths
+    settled = [False] * nStations # Nodes whose shortest path is known
+
+    toTreat = [(0, origin)] # Binary heap of (label, node)
+    remaining = None if targets is None else set(np.asarray(targets).tolist()) # Targets not settled yet
+
+    while toTreat:
+        currentLabel, currentNode = heapq.heappop(toTreat)
+        if(settled[currentNode]): # Outdated entry, the node has already been processed with a lower label
+            continue
+        settled[currentNode] = True
+
+        if(remaining is not None):
+            remaining.discard(currentNode)
+            if(len(remaining) == 0): # Every target is settled
+                break
+
+        for position in range(offsets[currentNode], offsets[currentNode+1]): # For all neighbors of currentNode
+            neighbor = heads[position]
+            newLabel = currentLabel + costs[position]
+            if(newLabel < labels[neighbor]): # If a better path is found (never true for an ignored arc)
+                labels[neighbor] = newLabel
+                precedent_nodes[neighbor] = currentNode
+                precedent_arcs[neighbor] = arcIds[position]
+                heapq.heappush(toTreat, (newLabel, neighbor))
+
+    labels, precedent_nodes, precedent_arcs = np.array(labels), np.array(precedent_nodes, dtype=int), np.array(precedent_arcs, dtype=int)
+    if(remaining is not None): # Forget the temporary labels of the nodes which weren't settled
+        unsettled = ~np.array(settled)
+        labels[unsettled], precedent_nodes[unsettled], precedent_arcs[unsettled] = np.inf, -1, -1
+
+    return labels, precedent_nodes, precedent_arcs
+
+def aStar(origin, destination, graph, costs, potentials):
+    """ Return the shortest path from origin to destination : labels, precedent_nodes, precedent_arcs (as shortestPaths, only the nodes reached by the search are labelled)
+        A* search : the next node to settle is the one with the smallest label + potential, the search stops once destination is settled
+
+        origin : Station from which the method computes the shortest path
+        destination : Station to reach
+        graph : Compressed-sparse-row adjacency of the network
+        costs : Cost of each stored arc (same order as graph.heads), arcs with an infinite cost are ignored
+        potentials : Lower bound on the cost from each node to destination (infinite : destination can't be reached from the node)
+    """
+    nStations = len(graph.offsets) - 1
+
+    # Python lists are much faster than numpy arrays for element-wise access
+    offsets = graph.offsets.tolist()
+    heads = graph.heads.tolist()
+    arcIds = graph.arcIds.tolist()
+    costs = np.asarray(costs, dtype=float).tolist()
+    potentials = np.asarray(potentials, dtype=float).tolist()
+
+    labels = [np.inf] * nStations
+    labels[origin] = 0
+    precedent_nodes = [-1] * nStations
+    precedent_arcs = [-1] * nStations
+
+    toTreat = [(potentials[origin], 0, origin)] # Binary heap of (label + potential, label, node)
+
+    while toTreat:
+        estimate, currentLabel, currentNode = heapq.heappop(toTreat)
+        if(currentLabel > labels[currentNode]): # Outdated entry
+            continue
+        if(currentNode == destination):
+            break
+
+        for position in range(offsets[currentNode], offsets[currentNode+1]): # For all neighbors of currentNode
+            neighbor = heads[position]
+            newLabel = currentLabel + costs[position]
+            if(newLabel < labels[neighbor] and potentials[neighbor] < np.inf): # Nodes which can't reach destination are never explored
+                labels[neighbor] = newLabel
+                precedent_nodes[neighbor] = currentNode
+                precedent_arcs[neighbor] = arcIds[position]
+                heapq.heappush(toTreat, (newLabel + potentials[neighbor], newLabel, neighbor))
+
+    return np.array(labels), np.array(precedent_nodes, dtype=int), np.array(precedent_arcs, dtype=int)
+
+def kShortestPaths(origin, destination, graph, costs, k, first = None):
+    """ Return the k shortest loopless paths from origin to destination, shortest first : list of (cost, nodes, arcs)
+        nodes : node_id's of the path from the origin (excluded) to the destination // arcs : arc_id's of the path, in the same order
+        Yen's algorithm : the i-th path is the best deviation (spur path) from one of the nodes of the previous paths,
+        computed with the nodes of the common beginning (root path) and the arcs already used after the same root arcs blocked
+
+        origin : Station from which the method computes the shortest paths
+        destination : Station to reach
+        graph : Compressed-sparse-row adjacency of the network
+        costs : Cost of each stored arc (same order as graph.heads), arcs with an infinite cost are ignored
+        k : Largest number of paths returned
+        first : (cost, nodes, arcs) of the shortest path, if already known
+    """
+    positions = getPositions(graph)
+    arcCosts = np.asarray(costs, dtype=float)[positions].tolist() # Cost of each arc, by arc_id
+    positions = positions.tolist()
+    adjacency = (graph.offsets.tolist(), graph.heads.tolist(), graph.arcIds.tolist(), np.asarray(costs, dtype=float).tolist())
+
+    if(first is None):
+        labels, precedent_nodes, precedent_arcs = shortestPaths(origin, graph, costs, targets = [destination])
+        if(labels[destination] == np.inf):
+            return []
+        first = (labels[destination],) + _backtrack(origin, destination, precedent_nodes, precedent_arcs)
+
+    paths = [(float(first[0]), [origin] + list(first[1]), list(first[2]))] # Paths found, their nodes include the origin
+    candidates = [] # Binary heap of (cost, nodes, arcs) of the deviations not taken yet
+    seen = set([tuple(paths[0][2])])
+
+    while len(paths) < k:
+        previousNodes, previousArcs = paths[-1][1], paths[-1][2]
+
+        for i in range(len(previousArcs)): # Deviate at the i-th node of the previous path
+            spur = previousNodes[i]
+            root = previousNodes[:i+1]
+
+            blockedNodes = set(root[:-1]) # The spur path can't go back to the root path
+            blockedPositions = set() # Leave the spur node by an arc not taken yet after this root path
+            for pathCost, nodes, arcs in paths:
+                if(arcs[:i] == previousArcs[:i]): # Same root path : compared by arcs, two parallel arcs give two root paths
+                    blockedPositions.add(positions[arcs[i]])
+
+            spurPath = _spurPath(spur, destination, adjacency, blockedNodes, blockedPositions)
+            if(spurPath is None):
+                continue
+
+            arcs = previousArcs[:i] + spurPath[2]
+            if(tuple(arcs) not in seen):
+                seen.add(tuple(arcs))
+                heapq.heappush(candidates, (sum(arcCosts[a] for a in previousArcs[:i]) + spurPath[0], root + spurPath[1], arcs))
+
+        if(len(candidates) == 0): # No other path
+            break
+        paths.append(heapq.heappop(candidates))
+
+    return [(pathCost, nodes[1:], arcs) for pathCost, nodes, arcs in paths]
+
+def _spurPath(origin, destination, adjacency, blockedNodes, blockedPositions):
+    """ Return the shortest path from origin to destination avoiding the blocked nodes and arcs : (cost, nodes, arcs), None if there is none
+        Dijkstra's algorithm stopped at destination, the labels are kept in dictionaries (only the explored nodes are labelled)
+
+        adjacency : offsets, heads, arcIds and costs of the CSR adjacency, as lists
+        blockedNodes : Set of the nodes which can't be entered
+        blockedPositions : Set of the positions in the CSR adjacency of the arcs which can't be used
+    """
+    offsets, heads, arcIds, costs = adjacency
+
+    labels = {origin: 0}
+    precedent_nodes, precedent_arcs = {}, {}
+    settled = set()
+    toTreat = [(0, origin)] # Binary heap of (label, node)
+
+    while toTreat:
+        currentLabel, currentNode = heapq.heappop(toTreat)
+        if(currentNode in settled):
+            continue
+        settled.add(currentNode)
+
+        if(currentNode == destination):
+            return (currentLabel,) + _backtrack(origin, destination, precedent_nodes, precedent_arcs)
+
+        for position in range(offsets[currentNode], offsets[currentNode+1]):
+            neighbor = heads[position]
+            if(neighbor in blockedNodes or position in blockedPositions):
+                continue
+            newLabel = currentLabel + costs[position]
+            if(newLabel < labels.get(neighbor, np.inf)):
+                labels[neighbor] = newLabel
+                precedent_nodes[neighbor] = currentNode
+                precedent_arcs[neighbor] = arcIds[position]
+                heapq.heappush(toTreat, (newLabel, neighbor))
+
+    return None
+
+def _backtrack(origin, destination, precedent_nodes, precedent_arcs):
+    """ Return the nodes (origin excluded) and the arcs of the path from origin to destination in a shortest path tree """
+    nodes, arcs = [], []
+    current = destination
+    while(current != origin):
+        nodes.append(int(current))
+        arcs.append(int(precedent_arcs[current]))
+        current = precedent_nodes[current]
+
+    return nodes[::-1], arcs[::-1]
+
+def reverseGraph(graph):
+    """ Return the compressed-sparse-row adjacency of the reversed network : the arcs entering node i are stored at positions offsets[i] to offsets[i+1]-1
+        heads : starting node of each stored arc // costs : its cost // arcIds : its arc_id
+    """
+    nStations = len(graph.offsets) - 1
+    tails = np.repeat(np.arange(nStations), np.diff(graph.offsets)) # Starting node of each arc of graph
+
+    order = np.argsort(graph.heads, kind='stable') # Group the arcs by ending node
+    offsets = np.zeros(nStations+1, dtype=int)
+    offsets[1:] = np.cumsum(np.bincount(graph.heads, minlength=nStations))
+
+    return Graph(offsets, tails[order], None if graph.costs is None else graph.costs[order], graph.arcIds[order])
+
+
+class ShortestPathTree(object):
+    """ Shortest path tree of one origin, kept up to date while nodes/arcs are deleted from the network (decremental)
+        Deleting nodes/arcs only detaches the subtrees hanging below them : only the nodes of these subtrees
+        are relabelled, from their remaining entering arcs, the rest of the tree is left as it is.
+    """
+
+    def __init__(self, origin, graph, reverse, costs):
+        """ origin : Root of the tree
+            graph : Compressed-sparse-row adjacency of the network
+            reverse : Compressed-sparse-row adjacency of the reversed network (see reverseGraph)
+            costs : Cost of each stored arc of graph (same order as graph.heads), never modified
+        """
+        self.origin = origin
+
+        labels, precedent_nodes, precedent_arcs = shortestPaths(origin, graph, costs)
+        self.labels = labels.tolist() # Cost of the shortest path from origin to each node
+        self.precedent_nodes = precedent_nodes.tolist() # Previous node of each node in the tree
+        self.precedent_arcs = precedent_arcs.tolist() # Previous arc of each node in the tree
+
+        self.children = [[] for i in range(len(self.labels))] # Next nodes of each node in the tree
+        for v, parent in enumerate(self.precedent_nodes):
+            if(parent >= 0):
+                self.children[parent].append(v)
+
+        # Python lists are much faster than numpy arrays for element-wise access
+        self.offsets, self.heads, self.arcIds = graph.offsets.tolist(), graph.heads.tolist(), graph.arcIds.tolist()
+        self.costs = np.asarray(costs, dtype=float).tolist()
+        self.reverseOffsets, self.reverseTails, self.reverseArcIds = reverse.offsets.tolist(), reverse.heads.tolist(), reverse.arcIds.tolist()
+        self.arcCosts = [0.0] * len(self.costs) # Cost of each arc, by arc_id
+        self.arcHeads = [0] * len(self.costs) # Ending node of each arc, by arc_id
+        for position, arcId in enumerate(self.arcIds):
+            self.arcCosts[arcId] = self.costs[position]
+            self.arcHeads[arcId] = self.heads[position]
+
+        self.blockedNodes = set() # Deleted nodes
+        self.blockedArcs = set() # Deleted arcs
+
+    def remove(self, nodes, arcs):
+        """ Delete nodes/arcs from the network and repair the tree
+            Return the nodes whose shortest path was recomputed (the nodes of the detached subtrees)
+
+            nodes : node_id's of the nodes to delete (the arcs entering them are ignored from now on)
+            arcs : arc_id's of the arcs to delete
+        """
+        labels, precedent_nodes, precedent_arcs, children = self.labels, self.precedent_nodes, self.precedent_arcs, self.children
+
+        # -- Roots of the detached subtrees --
+        roots = []
+        for v in nodes:
+            if(v not in self.blockedNodes):
+                self.blockedNodes.add(v)
+                if(v != self.origin and precedent_nodes[v] >= 0): # v is in the tree
+                    roots.append(v)
+
+        for a in arcs:
+            if(a not in self.blockedArcs):
+                self.blockedArcs.add(a)
+                if(precedent_arcs[self.arcHeads[a]] == a): # a is an arc of the tree
+                    roots.append(self.arcHeads[a])
+
+        # -- Detach the subtrees --
+        affected = [] # Nodes of the detached subtrees
+        inAffected = set()
+        for root in roots:
+            if(root in inAffected):
+                continue
+            children[precedent_nodes[root]].remove(root)
+            toVisit = [root]
+            while toVisit:
+                v = toVisit.pop()
+                if(v in inAffected):
+                    continue
+                inAffected.add(v)
+                affected.append(v)
+                toVisit.extend(children[v])
+
+        for v in affected:
+            labels[v] = np.inf
+            precedent_nodes[v] = -1
+            precedent_arcs[v] = -1
+            children[v] = []
+
+        # -- Best entering arc of each detached node from the rest of the tree --
+        toTreat = [] # Binary heap of (label, node)
+        for v in affected:
+            if(v in self.blockedNodes):
+                continue
+            for position in range(self.reverseOffsets[v], self.reverseOffsets[v+1]):
+                u, arcId = self.reverseTails[position], self.reverseArcIds[position]
+                if(u not in inAffected and arcId not in self.blockedArcs and labels[u] + self.arcCosts[arcId] < labels[v]):
+                    labels[v] = labels[u] + self.arcCosts[arcId]
+                    precedent_nodes[v] = u
+                    precedent_arcs[v] = arcId
+            if(labels[v] < np.inf):
+                heapq.heappush(toTreat, (labels[v], v))
+
+        # -- Dijkstra's algorithm restricted to the detached nodes (the labels of the other nodes cannot decrease) --
+        settled = set()
+        while toTreat:
+            currentLabel, currentNode = heapq.heappop(toTreat)
+            if(currentNode in settled or currentLabel > labels[currentNode]): # Outdated entry
+                continue
+            settled.add(currentNode)
+            children[precedent_nodes[currentNode]].append(currentNode)
+
+            for position in range(self.offsets[currentNode], self.offsets[currentNode+1]):
+                neighbor = self.heads[position]
+                if(neighbor not in inAffected or neighbor in settled or neighbor in self.blockedNodes or self.arcIds[position] in self.blockedArcs):
+                    continue
+                newLabel = currentLabel + self.costs[position]
+                if(newLabel < labels[neighbor]):
+                    labels[neighbor] = newLabel
+                    precedent_nodes[neighbor] = currentNode
+                    precedent_arcs[neighbor] = self.arcIds[position]
+                    heapq.heappush(toTreat, (newLabel, neighbor))
+
+        return affected
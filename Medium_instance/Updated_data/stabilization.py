@@ -0,0 +1,43 @@
+                    # ------------- STABILIZATION OF THE DUAL VALUES (WENTGES SMOOTHING) -------------
+
+import numpy as np
+
+
+class DualSmoothing(object):
+    """ Wentges smoothing : the pricing problem is solved at a point between the stability center and the duals of the restricted master,
+        separation point = alpha * center + (1-alpha) * duals. The stability center is the priced point with the best
+        Lagrangian bound so far : it only moves when a round improves the bound.
+        The duals are (dualCommodities, dualStations, dualArcs).
+    """
+
+    def __init__(self, alpha):
+        """ alpha : Weight of the stability center, in [0, 1) (0 : no smoothing) """
+        self.alpha = alpha
+        self.center = None # Stability center
+        self.bestBound = -np.inf # Lagrangian bound at the stability center
+        self.mispricings = 0 # Number of rounds where the separation point gave no improving path
+
+    def point(self, duals):
+        """ Return the separation point of the duals of the restricted master
+
+            duals : Dual values of the restricted master (dualCommodities, dualStations, dualArcs)
+        """
+        duals = tuple(np.asarray(values, dtype=float) for values in duals)
+        if(self.center is None or self.alpha == 0): # First round : the duals are priced as they are
+            return duals
+
+        return tuple(self.alpha * center + (1 - self.alpha) * values for center, values in zip(self.center, duals))
+
+    def update(self, duals, bound):
+        """ Make the priced duals the stability center if their Lagrangian bound improves the best one
+
+            duals : Dual values given to the pricing problem
+            bound : Lagrangian bound at these duals (None : not available, e.g. partial pricing)
+        """
+        if(bound is not None and bound > self.bestBound):
+            self.center = tuple(np.asarray(values, dtype=float) for values in duals)
+            self.bestBound = bound
+
+    def mispriced(self):
+        """ Record a round where no path of the separation point improves the restricted master (its duals have to be priced instead) """
+        self.mispricings += 1
@@ -1,73 +1,94 @@
+# --- TRANSFORM XLSX DATA TO A BINARY INSTANCE (see instance.py) ---
+#
+# python xlsx_to_python.py <workbook with Nodes_Final and Arcs_Final> <workbook with OD_Matrix_Final> <directory of the binary instance>
+#
+# The workbooks are opened in read-only mode and their rows are streamed : the arcs and the commodities
+# are written to the binary instance chunk by chunk, whatever the size of the OD matrix.
 
-# --- TRANSFORM XLSX DATA TO PYTHON ARRAY ---
+import sys
 
 import openpyxl
-import numpy
-
-excelfile = openpyxl.load_workbook('/Users/nicolas/Documents/EPFL/4.Printemps2018/Project/Column_generation/Medium_instance/New_data/SemesterProject_MFP_MediumInstance_Updated.xlsx')  # open medium data excel file
-sheet1 = excelfile.get_sheet_by_name("Nodes_Final") # Open each sheet
-sheet2 = excelfile.get_sheet_by_name("Arcs_Final")
-sheet3 = excelfile.get_sheet_by_name("OD_Matrix_Final")
-
-# Create new .txt file to write the transformed data
-newtext = open("/Users/nicolas/Documents/EPFL/4.Printemps2018/Project/Column_generation/Medium_instance/New_data/data_new.txt","w")
-
-# --- NODES ---
-
-newtext.write('node = [ \n\t')
-
-for row_index in range(2, (sheet1.max_row+1)):
-    newtext.write('[\'' + str(sheet1.cell(row=row_index, column=1).value)  + '\', ')   # Get station name
-    newtext.write(str(sheet1.cell(row=row_index, column=1).value[1:].lstrip('0')) + ', ')   # Get station id
-    if(str(sheet1.cell(row=row_index, column=2).value) == 'None'):  #Transform station type into integers
-        newtext.write('1')
-    if(str(sheet1.cell(row=row_index, column=2).value) == 'Local Shunting Yard'):
-        newtext.write('2')
-    if(str(sheet1.cell(row=row_index, column=2).value) == 'Shunting Yard'):
-        newtext.write('3')
-    if(str(sheet1.cell(row=row_index, column=2).value) == 'Marshalling Yard'):
-        newtext.write('4') 
-    newtext.write('], \n\t')
-    
-newtext.write(']')
-
-newtext.write('\n\n')
-
-# --- ARCS ---
-
-newtext.write('arc = [ \n\t')
-
-for row_index in range(2, (sheet2.max_row+1)):
-    #Forward
-    newtext.write('[' + str(sheet2.cell(row=row_index, column=1).value[1:].lstrip('0'))  + ', ')   # Get arc starting node
-    newtext.write(str(sheet2.cell(row=row_index, column=2).value[1:].lstrip('0')) + ', ')   # Get arc ending node
-    newtext.write(str(sheet2.cell(row=row_index, column=3).value) + ', ') # Get its length/cost
-    newtext.write(str(sheet2.cell(row=row_index, column=4).value)) # Get its capacity
-    newtext.write('], \n\t')
-    #Backward
-    newtext.write('[' + str(sheet2.cell(row=row_index, column=2).value[1:].lstrip('0'))  + ', ')   # Get arc starting node
-    newtext.write(str(sheet2.cell(row=row_index, column=1).value[1:].lstrip('0')) + ', ')   # Get arc ending node
-    newtext.write(str(sheet2.cell(row=row_index, column=3).value) + ', ') # Get its length/cost
-    newtext.write(str(sheet2.cell(row=row_index, column=4).value)) # Get its capacity
-    newtext.write('], \n\t')
-
-newtext.write(']')
-
-newtext.write('\n\n')
-
-# --- COMMODITIES ---
-
-newtext.write('commodities = [ \n\t')
-
-for row_index in range(2, (sheet3.max_row+1)):
-    newtext.write('[' + str( int(sheet3.cell(row=row_index, column=1).value[1:].lstrip('0')) - 1 ) + ', ')   # Get commodity starting node
-    newtext.write(str( int(sheet3.cell(row=row_index, column=2).value[1:].lstrip('0')) - 1 ) + ', ')   # Get commodity ending node
-    newtext.write(str(sheet3.cell(row=row_index, column=3).value)) # Get commodity quantity
-    newtext.write('], \n\t')
-    
-newtext.write(']')
-
-newtext.write('\n\n')
-
-# Do not forget to remove last commo of each array
-newtext.close()
+import numpy as np
+
+from instance import ColumnWriter
+
+chunk_size = 100000 # Number of rows kept in memory before being written
+
+nodeTypes = {None: 1, 'Local Shunting Yard': 2, 'Shunting Yard': 3, 'Marshalling Yard': 4} # Transform station type into integers
+
+
+def stationId(name):
+    """ Return the id of a station from its name (e.g. 'S0012' -> 12) """
+    return int(str(name)[1:].lstrip('0'))
+
+def writeRows(rows, columns, convert):
+    """ Convert the rows of a sheet and write them to the columns, one chunk at a time
+        Return the number of rows read
+
+        rows : Rows of the sheet (tuples of cell values)
+        columns : ColumnWriter of each value returned by convert
+        convert : Return the list of entries produced by a row, each entry is a tuple with one value per column
+    """
+    count = 0
+    chunk = []
+    for row in rows:
+        if(row[0] is None): # Empty row at the end of the sheet
+            continue
+        chunk.extend(convert(row))
+        count += 1
+
+        if(len(chunk) >= chunk_size):
+            for column, values in zip(columns, zip(*chunk)):
+                column.append(values)
+            chunk = []
+
+    if(len(chunk) > 0):
+        for column, values in zip(columns, zip(*chunk)):
+            column.append(values)
+
+    for column in columns:
+        column.close()
+
+    return count
+
+def convertWorkbooks(networkFile, odFile, directory):
+    """ Write the binary instance of the network of networkFile and the commodities of odFile
+
+        networkFile : Workbook with the sheets Nodes_Final and Arcs_Final
+        odFile : Workbook with the sheet OD_Matrix_Final
+        directory : Directory of the binary instance
+    """
+    network = openpyxl.load_workbook(networkFile, read_only=True) # Rows are read lazily
+    od = network if odFile == networkFile else openpyxl.load_workbook(odFile, read_only=True)
+
+    # --- NODES ---
+    nNodes = writeRows(network["Nodes_Final"].iter_rows(min_row=2, max_col=2, values_only=True),
+                       [ColumnWriter(directory, 'nodeNames', 'U16'), ColumnWriter(directory, 'nodeIds', np.int32), ColumnWriter(directory, 'nodeTypes', np.int8)],
+                       lambda row: [(str(row[0]), stationId(row[0]), nodeTypes[row[1]])])
+
+    # --- ARCS ---
+    nArcs = writeRows(network["Arcs_Final"].iter_rows(min_row=2, max_col=4, values_only=True),
+                      [ColumnWriter(directory, 'arcTails', np.int32), ColumnWriter(directory, 'arcHeads', np.int32),
+                       ColumnWriter(directory, 'arcCosts', np.int64), ColumnWriter(directory, 'arcCapacities', np.int64)],
+                      lambda row: [(stationId(row[0]), stationId(row[1]), row[2], row[3]), # Forward
+                                   (stationId(row[1]), stationId(row[0]), row[2], row[3])]) # Backward
+
+    # --- COMMODITIES ---
+    nCommodities = writeRows(od["OD_Matrix_Final"].iter_rows(min_row=2, max_col=3, values_only=True),
+                             [ColumnWriter(directory, 'origins', np.int32), ColumnWriter(directory, 'destinations', np.int32),
+                              ColumnWriter(directory, 'quantities', np.int64)],
+                             lambda row: [(stationId(row[0]) - 1, stationId(row[1]) - 1, row[2])]) # NodeId starts at 0
+
+    network.close()
+    if(od is not network):
+        od.close()
+
+    print('NODES : ', nNodes, ' --- ARCS : ', 2 * nArcs, ' --- COMMODITIES : ', nCommodities)
+
+
+if __name__ == '__main__':
+    if(len(sys.argv) != 4):
+        print('Usage : python xlsx_to_python.py <network workbook> <OD workbook> <directory of the binary instance>')
+        sys.exit(1)
+
+    convertWorkbooks(sys.argv[1], sys.argv[2], sys.argv[3])